@@ -2,9 +2,14 @@
 #       Imports
 # -----------------------------------------------------------#
 
+from .const import CONF_BURST, CONF_COALESCE_WINDOW, CONF_COMMANDS, CONF_JITTER, CONF_MAX_CONCURRENT, CONF_MAX_IN_FLIGHT, CONF_PERFORMANCE_METRICS, CONF_RATE, CONF_STARTUP, DEFAULT_COMMAND_BURST, DEFAULT_COMMAND_COALESCE_WINDOW, DEFAULT_COMMAND_MAX_IN_FLIGHT, DEFAULT_COMMAND_RATE, DEFAULT_STARTUP_JITTER, DEFAULT_STARTUP_MAX_CONCURRENT, SERVICE_APPLY_PROFILES
+from .helpers import AutomationTracker, CommandScheduler, LightGroupIndex, LightStateMirror, ManualControlDispatcher, ManualControlStateDetector, ReloadCoordinator, StartupScheduler, Statistics, TargetResolver, TimerWheel
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from logging import getLogger
 from typing import Any, Dict
+import voluptuous as vol
 
 
 # -----------------------------------------------------------#
@@ -14,9 +19,49 @@ from typing import Any, Dict
 DOMAIN = "automatic_lighting"
 DOMAIN_FRIENDLY_NAME = "Automatic Lighting"
 LOGGER_BASE_NAME = __name__
-PLATFORMS = ["switch"]
+PLATFORMS = ["sensor", "switch"]
 UNDO_UPDATE_LISTENER = "undo_update_listener"
 
+# ------ Domain Config ---------------
+DOMAIN_CONFIG = f"{DOMAIN}_config"
+
+# ------ Entry Data ---------------
+ENTITY = "entity"
+STATISTICS = "statistics"
+
+# ------ Shared Data ---------------
+AUTOMATION_TRACKER = "automation_tracker"
+COMMAND_SCHEDULER = "command_scheduler"
+LIGHT_GROUP_INDEX = "light_group_index"
+LIGHT_STATE_MIRROR = "light_state_mirror"
+MANUAL_CONTROL_DISPATCHER = "manual_control_dispatcher"
+MANUAL_CONTROL_STATE_DETECTOR = "manual_control_state_detector"
+RELOAD_COORDINATOR = "reload_coordinator"
+STARTUP_SCHEDULER = "startup_scheduler"
+TARGET_RESOLVER = "target_resolver"
+TIMER_WHEEL = "timer_wheel"
+SHARED_DATA = [AUTOMATION_TRACKER, COMMAND_SCHEDULER, LIGHT_GROUP_INDEX, LIGHT_STATE_MIRROR, MANUAL_CONTROL_DISPATCHER, MANUAL_CONTROL_STATE_DETECTOR, RELOAD_COORDINATOR, STARTUP_SCHEDULER, TARGET_RESOLVER, TIMER_WHEEL]
+
+
+# -----------------------------------------------------------#
+#       Schemas
+# -----------------------------------------------------------#
+
+CONFIG_SCHEMA = vol.Schema({
+    DOMAIN: vol.Schema({
+        vol.Optional(CONF_COMMANDS, default={}): vol.Schema({
+            vol.Optional(CONF_RATE, default=DEFAULT_COMMAND_RATE): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+            vol.Optional(CONF_BURST, default=DEFAULT_COMMAND_BURST): cv.positive_int,
+            vol.Optional(CONF_MAX_IN_FLIGHT, default=DEFAULT_COMMAND_MAX_IN_FLIGHT): cv.positive_int,
+            vol.Optional(CONF_COALESCE_WINDOW, default=DEFAULT_COMMAND_COALESCE_WINDOW): vol.All(vol.Coerce(float), vol.Range(min=0, max=1))
+        }),
+        vol.Optional(CONF_STARTUP, default={}): vol.Schema({
+            vol.Optional(CONF_MAX_CONCURRENT, default=DEFAULT_STARTUP_MAX_CONCURRENT): cv.positive_int,
+            vol.Optional(CONF_JITTER, default=DEFAULT_STARTUP_JITTER): vol.All(vol.Coerce(float), vol.Range(min=0))
+        })
+    })
+}, extra=vol.ALLOW_EXTRA)
+
 
 # -----------------------------------------------------------#
 #       Component Setup
@@ -24,12 +69,15 @@ UNDO_UPDATE_LISTENER = "undo_update_listener"
 
 
 async def async_setup(hass: HomeAssistant, config: Dict[str, Any]) -> bool:
+    hass.data[DOMAIN_CONFIG] = config.get(DOMAIN, {})
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     data = hass.data.setdefault(DOMAIN, {})
+    async_setup_shared_data(hass, data)
     data[config_entry.entry_id] = {
+        STATISTICS: Statistics(config_entry.options.get(CONF_PERFORMANCE_METRICS, False)),
         UNDO_UPDATE_LISTENER: config_entry.add_update_listener(async_update_options)
     }
 
@@ -42,7 +90,12 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
 
 
 async def async_update_options(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    data = hass.data[DOMAIN][config_entry.entry_id]
+
+    if ENTITY not in data or data[STATISTICS].enabled != config_entry.options.get(CONF_PERFORMANCE_METRICS, False):
+        return await hass.config_entries.async_reload(config_entry.entry_id)
+
+    data[ENTITY].async_update_options(config_entry.options)
 
 
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
@@ -59,7 +112,54 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     if unload_ok:
         data.pop(config_entry.entry_id)
 
-    if not data:
+    if not [key for key in data if key not in SHARED_DATA]:
+        async_unload_shared_data(data)
         hass.data.pop(DOMAIN)
+        hass.services.async_remove(DOMAIN, SERVICE_APPLY_PROFILES)
+
+    return unload_ok
+
+
+# -----------------------------------------------------------#
+#       Shared Data
+# -----------------------------------------------------------#
+
+def async_setup_shared_data(hass: HomeAssistant, data: Dict[str, Any]) -> None:
+    """ Sets up the objects shared between all config entries of the integration. """
+    if AUTOMATION_TRACKER not in data:
+        data[AUTOMATION_TRACKER] = AutomationTracker(hass)
+
+    if COMMAND_SCHEDULER not in data:
+        command_config = hass.data.get(DOMAIN_CONFIG, {}).get(CONF_COMMANDS, {})
+        data[COMMAND_SCHEDULER] = CommandScheduler(hass, getLogger(LOGGER_BASE_NAME), command_config.get(CONF_RATE, DEFAULT_COMMAND_RATE), command_config.get(CONF_BURST, DEFAULT_COMMAND_BURST), command_config.get(CONF_MAX_IN_FLIGHT, DEFAULT_COMMAND_MAX_IN_FLIGHT), command_config.get(CONF_COALESCE_WINDOW, DEFAULT_COMMAND_COALESCE_WINDOW))
+
+    if LIGHT_GROUP_INDEX not in data:
+        data[LIGHT_GROUP_INDEX] = LightGroupIndex(hass)
+
+    if LIGHT_STATE_MIRROR not in data:
+        data[LIGHT_STATE_MIRROR] = LightStateMirror(hass)
+
+    if RELOAD_COORDINATOR not in data:
+        data[RELOAD_COORDINATOR] = ReloadCoordinator(hass)
+
+    if STARTUP_SCHEDULER not in data:
+        startup_config = hass.data.get(DOMAIN_CONFIG, {}).get(CONF_STARTUP, {})
+        data[STARTUP_SCHEDULER] = StartupScheduler(hass, getLogger(LOGGER_BASE_NAME), startup_config.get(CONF_MAX_CONCURRENT, DEFAULT_STARTUP_MAX_CONCURRENT), startup_config.get(CONF_JITTER, DEFAULT_STARTUP_JITTER))
+
+    if TARGET_RESOLVER not in data:
+        data[TARGET_RESOLVER] = TargetResolver(hass)
+
+    if TIMER_WHEEL not in data:
+        data[TIMER_WHEEL] = TimerWheel(hass)
+
+    if MANUAL_CONTROL_DISPATCHER not in data:
+        data[MANUAL_CONTROL_DISPATCHER] = ManualControlDispatcher(hass, data[TARGET_RESOLVER])
+
+    if MANUAL_CONTROL_STATE_DETECTOR not in data:
+        data[MANUAL_CONTROL_STATE_DETECTOR] = ManualControlStateDetector(hass)
 
-    return unload_ok
\ No newline at end of file
+def async_unload_shared_data(data: Dict[str, Any]) -> None:
+    """ Stops and removes the objects shared between all config entries of the integration. """
+    for key in SHARED_DATA:
+        if key in data:
+            data.pop(key).async_stop()
\ No newline at end of file
@@ -0,0 +1,155 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from ..helpers.light_groups import LightGroupTopology
+from random import Random
+from time import perf_counter
+from typing import Dict, List, Set, Tuple
+import argparse
+
+
+#-----------------------------------------------------------#
+#       Legacy Planner
+#-----------------------------------------------------------#
+
+def legacy_plan_turn_off(light_groups: Dict[str, List[str]], old_entity_ids: List[str], new_entity_ids: List[str]) -> List[str]:
+    """ The list based planner previously used by AL_SwitchEntity._turn_off_unused_entities (without the state filter). """
+    blacklist = []
+    unused_entities = []
+
+    for i in old_entity_ids:
+        if i in light_groups:
+            blacklist = blacklist + light_groups[i]
+            unused_entities.append(i)
+            continue
+
+    for i in old_entity_ids:
+        if i in light_groups:
+            continue
+
+        if not i in blacklist:
+            unused_entities.append(i)
+
+    for i in new_entity_ids:
+        for x in unused_entities:
+            if x in light_groups and i in light_groups[x]:
+                unused_entities.remove(x)
+                unused_entities = unused_entities + [t for t in light_groups[x] if t not in new_entity_ids]
+
+            if x == i:
+                unused_entities.remove(x)
+
+    return unused_entities
+
+
+#-----------------------------------------------------------#
+#       Layouts
+#-----------------------------------------------------------#
+
+def generate_layout(random: Random, groups: int, members: int, singles: int, overlap: float) -> Tuple[Dict[str, List[str]], List[str]]:
+    """ Generates light groups, sharing members between groups with the overlap probability, and a number of ungrouped lights. """
+    light_groups = {}
+
+    for g in range(groups):
+        lights = []
+
+        for m in range(members):
+            if light_groups and random.random() < overlap:
+                lights.append(random.choice(random.choice(list(light_groups.values()))))
+            else:
+                lights.append(f"light.group_{g}_member_{m}")
+
+        light_groups[f"light.group_{g}"] = sorted(set(lights))
+
+    single_lights = [f"light.single_{s}" for s in range(singles)]
+    return light_groups, single_lights
+
+def generate_profile(random: Random, light_groups: Dict[str, List[str]], single_lights: List[str]) -> List[str]:
+    """ Generates the lights of a profile: some whole groups, plus some members of other groups and some ungrouped lights. """
+    groups = list(light_groups.keys())
+    chosen_groups = random.sample(groups, random.randint(0, len(groups) // 4))
+    other_members = [member for group in groups if group not in chosen_groups for member in light_groups[group]]
+    chosen_members = random.sample(other_members, random.randint(0, len(other_members) // 4))
+    chosen_singles = random.sample(single_lights, random.randint(0, len(single_lights) // 2))
+    lights = chosen_groups + chosen_members + chosen_singles
+    random.shuffle(lights)
+    return lights
+
+
+#-----------------------------------------------------------#
+#       Verification
+#-----------------------------------------------------------#
+
+def is_correct_plan(topology: LightGroupTopology, old_entity_ids: List[str], new_entity_ids: List[str], plan: List[str]) -> bool:
+    """ Determines whether a plan turns off exactly the lights targeted by the old entities and not by the new entities (with light groups expanded to their members on both sides). """
+    new_lights: Set[str] = topology.expand(new_entity_ids) | set(new_entity_ids)
+    expected_lights = topology.expand(old_entity_ids) - new_lights
+    return topology.expand(plan) == expected_lights and not any(entity_id in new_lights for entity_id in plan)
+
+
+#-----------------------------------------------------------#
+#       Benchmark
+#-----------------------------------------------------------#
+
+def run(groups: int, members: int, singles: int, profiles: int, overlap: float, seed: int) -> None:
+    """ Runs both planners over the same generated profile switches, verifying the output and reporting the timings. """
+    random = Random(seed)
+    light_groups, single_lights = generate_layout(random, groups, members, singles, overlap)
+    topology = LightGroupTopology(light_groups)
+    tracked_lights = list(topology.members) + single_lights
+    cases = []
+
+    for _ in range(profiles):
+        new_entity_ids = generate_profile(random, light_groups, single_lights)
+        cases.append((tracked_lights, new_entity_ids))
+        cases.append((generate_profile(random, light_groups, single_lights), new_entity_ids))
+
+    started = perf_counter()
+    legacy_results = [legacy_plan_turn_off(light_groups, old, new) for old, new in cases]
+    legacy_time = perf_counter() - started
+
+    started = perf_counter()
+    results = [topology.plan_turn_off(old, new) for old, new in cases]
+    time = perf_counter() - started
+
+    legacy_correct = sum(1 for (old, new), result in zip(cases, legacy_results) if is_correct_plan(topology, old, new, result))
+    correct = sum(1 for (old, new), result in zip(cases, results) if is_correct_plan(topology, old, new, result))
+    identical = sum(1 for legacy_result, result in zip(legacy_results, results) if sorted(set(legacy_result)) == result)
+
+    print(f"Layout: {groups} groups x {members} members ({overlap:.0%} overlap), {singles} ungrouped lights, {len(cases)} plans.")
+    print(f"  Legacy planner: {legacy_time * 1000:10.2f} ms ({legacy_time / len(cases) * 1e6:10.2f} us/plan), correct: {legacy_correct}/{len(cases)}")
+    print(f"  Set planner:    {time * 1000:10.2f} ms ({time / len(cases) * 1e6:10.2f} us/plan), correct: {correct}/{len(cases)}")
+    print(f"  Identical output: {identical}/{len(cases)}")
+
+    commands = [sorted(topology.expand(new)) for _, new in cases]
+    started = perf_counter()
+    compressed = [topology.compress(command) for command in commands]
+    compress_time = perf_counter() - started
+
+    messages = sum(len(command) for command in commands)
+    compressed_messages = sum(len(command) for command in compressed)
+    wrong_targets = sum(1 for command, result in zip(commands, compressed) if topology.expand(result) != set(command))
+
+    print(f"  Compressor:     {compress_time * 1000:10.2f} ms ({compress_time / len(cases) * 1e6:10.2f} us/command)")
+    print(f"  Messages: {messages} -> {compressed_messages} ({messages - compressed_messages} saved), identical targets: {len(cases) - wrong_targets}/{len(cases)}")
+
+    if correct < len(cases) or wrong_targets:
+        raise SystemExit(1)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compares the legacy and set based turn-off planners, and measures the messages saved by the group compressor.")
+    parser.add_argument("--groups", type=int, default=100)
+    parser.add_argument("--members", type=int, default=8)
+    parser.add_argument("--singles", type=int, default=100)
+    parser.add_argument("--profiles", type=int, default=200)
+    parser.add_argument("--overlap", type=float, nargs="+", default=[0, 0.3])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for overlap in args.overlap:
+        run(args.groups, args.members, args.singles, args.profiles, overlap, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from .. import COMMAND_SCHEDULER, DOMAIN, LOGGER_BASE_NAME, RELOAD_COORDINATOR, STARTUP_SCHEDULER
+from ..const import SERVICE_APPLY_PROFILES, STATUS_ACTIVE
+from ..helpers import CommandScheduler, StartupScheduler
+from ..switch import TURN_ON_THROTTLE_TIME
+from .fake_hass import async_create_hass, async_create_switches, async_stop_hass
+from homeassistant.components.automation import DOMAIN as AUTOMATION_DOMAIN
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.const import CONF_ENTITY_ID, CONF_ID, CONF_LIGHTS, SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+from logging import getLogger
+from random import Random
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Awaitable, Callable, List
+import argparse
+import asyncio
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+IDLE_POLL_INTERVAL = 0.001
+
+
+#-----------------------------------------------------------#
+#       Helpers
+#-----------------------------------------------------------#
+
+async def async_wait_idle(hass: HomeAssistant, switches: SimpleNamespace) -> None:
+    """ Waits until no switch is blocked or has a reset or request cycle pending or running, and all light commands have been sent. """
+    while True:
+        await hass.async_block_till_done()
+
+        if hass.data[DOMAIN][RELOAD_COORDINATOR].is_idle and hass.data[DOMAIN][COMMAND_SCHEDULER].is_idle and hass.data[DOMAIN][STARTUP_SCHEDULER].is_idle and not any(entity._block_timer or entity._reset_timer or entity._request_timer for entity in switches.entities.values()):
+            return
+
+        await asyncio.sleep(IDLE_POLL_INTERVAL)
+
+async def async_measure(count: int, action: Callable[[int], Awaitable[None]]) -> List[float]:
+    """ Runs the action count times, returning the latency of each run. """
+    latencies = []
+
+    for i in range(count):
+        started = perf_counter()
+        await action(i)
+        latencies.append(perf_counter() - started)
+
+    return latencies
+
+def percentile(values: List[float], p: float) -> float:
+    """ Gets the p'th percentile of the values. """
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+def report(name: str, latencies: List[float], events_per_run: int, switches: SimpleNamespace) -> None:
+    """ Prints the latency percentiles, throughput and light commands of a scenario. """
+    total = sum(latencies)
+    print(
+        f"{name:<24} runs={len(latencies):<6} "
+        f"p50={percentile(latencies, 50) * 1000:8.3f}ms p90={percentile(latencies, 90) * 1000:8.3f}ms "
+        f"p99={percentile(latencies, 99) * 1000:8.3f}ms max={max(latencies) * 1000:8.3f}ms "
+        f"events/s={len(latencies) * events_per_run / total if total else 0:10.1f} "
+        f"light calls={sum(switches.lights.calls.values()):<6} commands={sum(switches.lights.commands.values())}"
+    )
+    switches.lights.reset_counters()
+
+
+#-----------------------------------------------------------#
+#       Scenarios
+#-----------------------------------------------------------#
+
+async def async_scenario_startup(hass: HomeAssistant, switches: SimpleNamespace, random: Random, runs: int) -> None:
+    """ Turns every switch off and on again, measuring how long it takes until all request cycles have finished. """
+    async def action(i: int) -> None:
+        for entity in switches.entities.values():
+            await entity.async_turn_off()
+
+        for entity in switches.entities.values():
+            await entity.async_turn_on()
+
+        await async_wait_idle(hass, switches)
+
+    report("startup", await async_measure(runs, action), len(switches.entities), switches)
+
+async def async_scenario_warm_up(hass: HomeAssistant, switches: SimpleNamespace, random: Random, runs: int) -> None:
+    """ Turns every switch off and lets the startup scheduler turn them on again in waves, measuring the warm-up time it reports. """
+    scheduler = hass.data[DOMAIN][STARTUP_SCHEDULER]
+
+    async def action(i: int) -> None:
+        for entity in switches.entities.values():
+            await entity.async_turn_off()
+
+        for entity in switches.entities.values():
+            scheduler.async_schedule(entity.unique_id, entity.async_turn_on)
+
+        await async_wait_idle(hass, switches)
+
+    latencies = await async_measure(runs, action)
+    report("warm_up", latencies, len(switches.entities), switches)
+    print(f"{'':<24} last warm-up={scheduler.warm_up_time * 1000:.3f}ms waves={scheduler.diagnostics['waves']}")
+
+async def async_scenario_service_call_storm(hass: HomeAssistant, switches: SimpleNamespace, random: Random, runs: int) -> None:
+    """ Calls light.turn_on on random (tracked and untracked) lights from outside the integration. """
+    lights = [light for room_lights in switches.room_lights.values() for light in room_lights]
+    untracked_lights = [f"light.untracked_{i}" for i in range(len(lights))]
+
+    for light in untracked_lights:
+        hass.states.async_set(light, STATE_OFF)
+
+    async def action(i: int) -> None:
+        light = random.choice(lights if i % 2 else untracked_lights)
+        await hass.services.async_call(LIGHT_DOMAIN, SERVICE_TURN_ON, { CONF_ENTITY_ID: [light] }, blocking=True)
+        await hass.async_block_till_done()
+
+    report("service_call_storm", await async_measure(runs, action), 1, switches)
+    await async_wait_idle(hass, switches)
+
+async def async_scenario_automation_reload_storm(hass: HomeAssistant, switches: SimpleNamespace, random: Random, runs: int) -> None:
+    """ Reloads the automations, measuring how long it takes until all switches have finished their reset and request cycles. """
+    async def action(i: int) -> None:
+        switches.automations.brightness = 100 + i % 100
+        await switches.automations.async_reload()
+        await async_wait_idle(hass, switches)
+
+    report("automation_reload_storm", await async_measure(runs, action), 1, switches)
+    diagnostics = hass.data[DOMAIN][COMMAND_SCHEDULER].diagnostics
+    print(f"{'':<24} peak queued commands={diagnostics['peak_queued']} peak in flight={diagnostics['peak_in_flight']} average wait={(diagnostics['average_wait'] or 0) * 1000:.3f}ms superseded={diagnostics['superseded']}")
+
+async def async_scenario_automation_toggle(hass: HomeAssistant, switches: SimpleNamespace, random: Random, runs: int) -> None:
+    """ Toggles a single automation, measuring how long it takes until the affected switches are idle again. """
+    automations = hass.states.async_entity_ids(AUTOMATION_DOMAIN)
+
+    async def action(i: int) -> None:
+        entity_id = random.choice(automations)
+        hass.states.async_set(entity_id, STATE_OFF if hass.states.is_state(entity_id, STATE_ON) else STATE_ON)
+        await async_wait_idle(hass, switches)
+
+    report("automation_toggle", await async_measure(runs, action), 1, switches)
+
+async def async_scenario_block_churn(hass: HomeAssistant, switches: SimpleNamespace, random: Random, runs: int) -> None:
+    """ Manually controls a random tracked light, blocking its switch, and waits for the switch to unblock and request again. """
+    async def action(i: int) -> None:
+        entity_id = random.choice(list(switches.entities.keys()))
+        light = random.choice(switches.room_lights[entity_id])
+        await hass.services.async_call(LIGHT_DOMAIN, SERVICE_TURN_ON, { CONF_ENTITY_ID: [light], "brightness": random.randint(1, 255) }, blocking=True)
+
+        while switches.entities[entity_id].is_blocked:
+            await asyncio.sleep(IDLE_POLL_INTERVAL)
+
+        await async_wait_idle(hass, switches)
+
+    report("block_churn", await async_measure(runs, action), 1, switches)
+
+async def async_scenario_scene(hass: HomeAssistant, switches: SimpleNamespace, random: Random, runs: int) -> None:
+    """ Turns on a house-wide scene by calling turn_on on every switch, and by one apply_profiles call for all switches. Waits for the turn on throttle between runs, outside of the measurement. """
+    async def async_measure_scene(name: str, action: Callable[[int], Awaitable[None]]) -> None:
+        latencies = []
+
+        for i in range(runs):
+            await asyncio.sleep(TURN_ON_THROTTLE_TIME)
+            started = perf_counter()
+            await action(i)
+            await async_wait_idle(hass, switches)
+            latencies.append(perf_counter() - started)
+
+        report(name, latencies, len(switches.entities), switches)
+
+    async def per_switch(i: int) -> None:
+        for entity_id, entity in switches.entities.items():
+            await entity._async_service_turn_on(id="scene", status=STATUS_ACTIVE, lights=switches.room_lights[entity_id], brightness=100 + i % 2 * 100)
+
+    async def batch(i: int) -> None:
+        profiles = [{ CONF_ENTITY_ID: entity_id, CONF_ID: "scene", "status": STATUS_ACTIVE, CONF_LIGHTS: switches.room_lights[entity_id], "brightness": 100 + i % 2 * 100 } for entity_id in switches.entities]
+        await hass.services.async_call(DOMAIN, SERVICE_APPLY_PROFILES, { "profiles": profiles }, blocking=True)
+
+    await async_measure_scene("scene_per_switch", per_switch)
+    await async_measure_scene("scene_batch", batch)
+    print(f"{'':<24} merged commands={hass.data[DOMAIN][COMMAND_SCHEDULER].diagnostics['merged']}")
+
+
+#-----------------------------------------------------------#
+#       Benchmark
+#-----------------------------------------------------------#
+
+SCENARIOS = {
+    "startup": async_scenario_startup,
+    "warm_up": async_scenario_warm_up,
+    "service_call_storm": async_scenario_service_call_storm,
+    "automation_reload_storm": async_scenario_automation_reload_storm,
+    "automation_toggle": async_scenario_automation_toggle,
+    "block_churn": async_scenario_block_churn,
+    "scene": async_scenario_scene,
+}
+
+async def async_run(args: argparse.Namespace) -> None:
+    """ Sets up the switches and runs the selected scenarios. """
+    random = Random(args.seed)
+    hass = await async_create_hass()
+    hass.data[DOMAIN][COMMAND_SCHEDULER] = CommandScheduler(hass, getLogger(LOGGER_BASE_NAME), args.command_rate, args.command_burst, args.command_max_in_flight, args.command_coalesce_window)
+    hass.data[DOMAIN][STARTUP_SCHEDULER] = StartupScheduler(hass, getLogger(LOGGER_BASE_NAME), args.startup_max_concurrent, args.startup_jitter, start_delay=0)
+    switches = await async_create_switches(hass, args.switches, args.lights // args.switches, args.group_size, block_duration=0, speculative_replay=args.speculative_replay)
+    await async_wait_idle(hass, switches)
+    switches.lights.reset_counters()
+
+    print(f"{args.switches} switches x {args.lights // args.switches} lights (groups of {args.group_size}).")
+
+    for name in args.scenarios:
+        await SCENARIOS[name](hass, switches, random, args.runs)
+
+    await async_stop_hass(hass, switches)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks the switch state machine against an in-process Home Assistant core.")
+    parser.add_argument("--switches", type=int, default=50)
+    parser.add_argument("--lights", type=int, default=500)
+    parser.add_argument("--group-size", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--speculative-replay", action="store_true")
+    parser.add_argument("--startup-max-concurrent", type=int, default=5)
+    parser.add_argument("--startup-jitter", type=float, default=0.05)
+    parser.add_argument("--command-rate", type=float, default=50)
+    parser.add_argument("--command-burst", type=int, default=100)
+    parser.add_argument("--command-max-in-flight", type=int, default=10)
+    parser.add_argument("--command-coalesce-window", type=float, default=0.05)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS.keys()), default=list(SCENARIOS.keys()))
+    args = parser.parse_args()
+
+    asyncio.run(async_run(args))
+
+
+if __name__ == "__main__":
+    main()
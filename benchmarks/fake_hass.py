@@ -0,0 +1,227 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from .. import DOMAIN, ENTITY, async_setup_shared_data, async_unload_shared_data
+from ..const import CONF_BLOCK_DURATION, CONF_LIGHT_GROUPS, CONF_SPECULATIVE_REPLAY, EVENT_DATA_TYPE_REQUEST, EVENT_DATA_TYPE_RESET, EVENT_TYPE_AUTOMATIC_LIGHTING, SERVICE_APPLY_PROFILES, SERVICE_SCHEMA_APPLY_PROFILES, STATUS_ACTIVE
+from ..switch import AL_SwitchEntity, async_service_apply_profiles
+from homeassistant.components.automation import DOMAIN as AUTOMATION_DOMAIN, EVENT_AUTOMATION_RELOADED, EVENT_AUTOMATION_TRIGGERED
+from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_COLOR_TEMP, ATTR_KELVIN, DOMAIN as LIGHT_DOMAIN
+from homeassistant.const import ATTR_DOMAIN, ATTR_SERVICE, ATTR_SERVICE_DATA, CONF_ENTITY_ID, CONF_NAME, EVENT_CALL_SERVICE, SERVICE_RELOAD, SERVICE_TURN_OFF, SERVICE_TURN_ON, STATE_OFF, STATE_ON
+from homeassistant.core import Context, Event, HomeAssistant, ServiceCall
+from homeassistant.helpers import device_registry, entity_registry
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util.color import color_temperature_kelvin_to_mired
+from functools import partial
+from tempfile import mkdtemp
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+
+#-----------------------------------------------------------#
+#       Registries
+#-----------------------------------------------------------#
+
+class FakeRegistry:
+    """ A stand-in for the entity and device registries, holding no entries unless added. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self):
+        self.devices = {}
+        self.entities = {}
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def async_get(self, id: str) -> Any:
+        """ Gets an entity or device entry. """
+        return self.entities.get(id, None) or self.devices.get(id, None)
+
+
+#-----------------------------------------------------------#
+#       Lights
+#-----------------------------------------------------------#
+
+class FakeLights:
+    """ A stand-in for the light platform, changing the state of the lights (and of light group members) and counting the service calls. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant, entity_ids: List[str], light_groups: Dict[str, List[str]] = {}):
+        self._hass = hass
+        self._light_groups = light_groups
+        self.calls = { SERVICE_TURN_OFF: 0, SERVICE_TURN_ON: 0 }
+        self.commands = { SERVICE_TURN_OFF: 0, SERVICE_TURN_ON: 0 }
+
+        for entity_id in [*entity_ids, *light_groups.keys()]:
+            hass.states.async_set(entity_id, STATE_OFF)
+
+        hass.services.async_register(LIGHT_DOMAIN, SERVICE_TURN_OFF, self._async_handle_service)
+        hass.services.async_register(LIGHT_DOMAIN, SERVICE_TURN_ON, self._async_handle_service)
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def reset_counters(self) -> None:
+        """ Resets the call and command counters. """
+        self.calls = { SERVICE_TURN_OFF: 0, SERVICE_TURN_ON: 0 }
+        self.commands = { SERVICE_TURN_OFF: 0, SERVICE_TURN_ON: 0 }
+
+
+    #--------------------------------------------#
+    #       Service Handlers
+    #--------------------------------------------#
+
+    async def _async_handle_service(self, call: ServiceCall) -> None:
+        """ Handles a light.turn_on or light.turn_off call. """
+        entity_ids = cv.ensure_list_csv(call.data.get(CONF_ENTITY_ID, []))
+        self.calls[call.service] += 1
+        self.commands[call.service] += len(entity_ids)
+
+        for entity_id in entity_ids:
+            self._set_state(entity_id, call, call.context)
+
+            for member in self._light_groups.get(entity_id, []):
+                self._set_state(member, call, Context())
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _set_state(self, entity_id: str, call: ServiceCall, context: Context) -> None:
+        """ Changes the state of a light as requested by a light.turn_on or light.turn_off call. """
+        if call.service == SERVICE_TURN_OFF:
+            self._hass.states.async_set(entity_id, STATE_OFF, context=context)
+            return
+
+        attributes = { **(self._hass.states.get(entity_id).attributes if self._hass.states.get(entity_id) else {}) }
+
+        if ATTR_BRIGHTNESS in call.data:
+            attributes[ATTR_BRIGHTNESS] = call.data[ATTR_BRIGHTNESS]
+
+        if ATTR_KELVIN in call.data:
+            attributes[ATTR_COLOR_TEMP] = color_temperature_kelvin_to_mired(call.data[ATTR_KELVIN])
+
+        self._hass.states.async_set(entity_id, STATE_ON, attributes, context=context)
+
+
+#-----------------------------------------------------------#
+#       Automations
+#-----------------------------------------------------------#
+
+class FakeAutomations:
+    """ A stand-in for the automations responding to the request and reset events of the switches. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant, switches: Dict[str, AL_SwitchEntity], lights: Dict[str, List[str]]):
+        self._hass = hass
+        self._lights = lights
+        self._switches = switches
+        self.brightness = 128
+
+        for entity_id in switches:
+            hass.states.async_set(self._automation_id(entity_id), STATE_ON)
+
+        hass.bus.async_listen(EVENT_TYPE_AUTOMATIC_LIGHTING, self._async_on_event)
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    async def async_reload(self) -> None:
+        """ Simulates an automation reload: a reload service call, every automation removed and re-added, and the reloaded event. """
+        self._hass.bus.async_fire(EVENT_CALL_SERVICE, { ATTR_DOMAIN: AUTOMATION_DOMAIN, ATTR_SERVICE: SERVICE_RELOAD, ATTR_SERVICE_DATA: {} })
+
+        for entity_id in self._switches:
+            self._hass.states.async_remove(self._automation_id(entity_id))
+
+        for entity_id in self._switches:
+            self._hass.states.async_set(self._automation_id(entity_id), STATE_ON)
+
+        self._hass.bus.async_fire(EVENT_AUTOMATION_RELOADED, {})
+
+    def _automation_id(self, entity_id: str) -> str:
+        """ Gets the entity id of the automation serving a switch. """
+        return f"{AUTOMATION_DOMAIN}.{entity_id.split('.')[1]}"
+
+
+    #--------------------------------------------#
+    #       Event Handlers
+    #--------------------------------------------#
+
+    async def _async_on_event(self, event: Event) -> None:
+        """ Responds to a request or reset event the way a lighting automation would. """
+        switch = self._switches.get(event.data.get(CONF_ENTITY_ID), None)
+
+        if switch is None:
+            return
+
+        context = Context(parent_id=event.context.id)
+        self._hass.bus.async_fire(EVENT_AUTOMATION_TRIGGERED, { CONF_ENTITY_ID: self._automation_id(switch.entity_id) }, context=context)
+        switch.async_set_context(context)
+
+        if event.data.get("type") == EVENT_DATA_TYPE_RESET:
+            await switch._async_service_track_lights(lights=self._lights[switch.entity_id])
+        elif event.data.get("type") == EVENT_DATA_TYPE_REQUEST:
+            await switch._async_service_turn_on(id="benchmark", status=STATUS_ACTIVE, lights=self._lights[switch.entity_id], brightness=self.brightness)
+
+
+#-----------------------------------------------------------#
+#       Setup
+#-----------------------------------------------------------#
+
+async def async_create_hass() -> HomeAssistant:
+    """ Creates an in-process Home Assistant core with stand-in registries. """
+    hass = HomeAssistant()
+    hass.config.config_dir = mkdtemp()
+    hass.data[device_registry.DATA_REGISTRY] = FakeRegistry()
+    hass.data[entity_registry.DATA_REGISTRY] = FakeRegistry()
+    async_setup_shared_data(hass, hass.data.setdefault(DOMAIN, {}))
+    return hass
+
+async def async_create_switches(hass: HomeAssistant, switches: int, lights_per_switch: int, group_size: int, block_duration: int = 1, speculative_replay: bool = False) -> SimpleNamespace:
+    """ Creates the switches, the lights of every switch and the stand-in light platform and automations. """
+    entities = {}
+    lights = {}
+    all_light_groups = {}
+
+    for i in range(switches):
+        room_lights = [f"light.room_{i}_light_{l}" for l in range(lights_per_switch)]
+        light_groups = { f"light.room_{i}_group_{g}": room_lights[g:g + group_size] for g in range(0, lights_per_switch, group_size) }
+        all_light_groups.update(light_groups)
+        config_entry = SimpleNamespace(entry_id=f"benchmark_{i}", unique_id=f"room_{i}", data={ CONF_NAME: f"Room {i}" }, options={ CONF_BLOCK_DURATION: block_duration, CONF_LIGHT_GROUPS: light_groups, CONF_SPECULATIVE_REPLAY: speculative_replay })
+
+        entity = AL_SwitchEntity(config_entry)
+        entity.hass = hass
+        entity.entity_id = f"switch.room_{i}"
+        entities[entity.entity_id] = entity
+        lights[entity.entity_id] = room_lights
+        hass.data[DOMAIN][config_entry.entry_id] = { ENTITY: entity }
+
+    fake_lights = FakeLights(hass, [light for room_lights in lights.values() for light in room_lights], all_light_groups)
+    fake_automations = FakeAutomations(hass, entities, lights)
+    hass.services.async_register(DOMAIN, SERVICE_APPLY_PROFILES, partial(async_service_apply_profiles, hass), SERVICE_SCHEMA_APPLY_PROFILES)
+
+    for entity in entities.values():
+        await entity.async_turn_on()
+
+    return SimpleNamespace(automations=fake_automations, entities=entities, lights=fake_lights, room_lights=lights)
+
+async def async_stop_hass(hass: HomeAssistant, switches: SimpleNamespace) -> None:
+    """ Turns off the switches and stops the shared objects. """
+    for entity in switches.entities.values():
+        await entity.async_will_remove_from_hass()
+
+    await hass.async_block_till_done()
+    async_unload_shared_data(hass.data[DOMAIN])
@@ -4,7 +4,7 @@
 
 from __future__ import annotations
 from . import DOMAIN
-from .const import CONF_BLOCK_DURATION, CONF_LIGHT_GROUPS, DEFAULT_BLOCK_DURATION
+from .const import CONF_BLOCK_DURATION, CONF_LIGHT_GROUPS, CONF_MANUAL_CONTROL_MODE, CONF_PERFORMANCE_METRICS, CONF_RESPONSE_TIMEOUT, CONF_SPECULATIVE_REPLAY, DEFAULT_BLOCK_DURATION, DEFAULT_MANUAL_CONTROL_MODE, DEFAULT_RESPONSE_TIMEOUT, MANUAL_CONTROL_MODES
 from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
 from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
 from homeassistant.const import CONF_ENTITIES, CONF_ENTITY_ID, CONF_NAME
@@ -85,6 +85,10 @@ class AL_OptionsFlow(OptionsFlow):
 
         if user_input is not None:
             self._data[CONF_BLOCK_DURATION] = user_input[CONF_BLOCK_DURATION]
+            self._data[CONF_RESPONSE_TIMEOUT] = user_input[CONF_RESPONSE_TIMEOUT]
+            self._data[CONF_SPECULATIVE_REPLAY] = user_input[CONF_SPECULATIVE_REPLAY]
+            self._data[CONF_MANUAL_CONTROL_MODE] = user_input[CONF_MANUAL_CONTROL_MODE]
+            self._data[CONF_PERFORMANCE_METRICS] = user_input[CONF_PERFORMANCE_METRICS]
             light_groups = {}
 
             for key in user_input[CONF_LIGHT_GROUPS]:
@@ -103,6 +107,10 @@ class AL_OptionsFlow(OptionsFlow):
 
         schema = vol.Schema({
             vol.Required(CONF_BLOCK_DURATION, default=self._data.get(CONF_BLOCK_DURATION, DEFAULT_BLOCK_DURATION)): vol.All(int, vol.Range(min=0)),
+            vol.Required(CONF_RESPONSE_TIMEOUT, default=self._data.get(CONF_RESPONSE_TIMEOUT, DEFAULT_RESPONSE_TIMEOUT)): vol.All(vol.Coerce(float), vol.Range(min=0.05, max=10)),
+            vol.Required(CONF_SPECULATIVE_REPLAY, default=self._data.get(CONF_SPECULATIVE_REPLAY, False)): bool,
+            vol.Required(CONF_MANUAL_CONTROL_MODE, default=self._data.get(CONF_MANUAL_CONTROL_MODE, DEFAULT_MANUAL_CONTROL_MODE)): vol.In(MANUAL_CONTROL_MODES),
+            vol.Required(CONF_PERFORMANCE_METRICS, default=self._data.get(CONF_PERFORMANCE_METRICS, False)): bool,
             vol.Required(CONF_LIGHT_GROUPS, default=list(self._data.get(CONF_LIGHT_GROUPS, {}).keys())): cv.multi_select(sorted(list(self._data.get(CONF_LIGHT_GROUPS, {}).keys()))),
             vol.Optional(CONF_ENTITY_ID): vol.In(light_entity_ids),
             vol.Optional(CONF_ENTITIES, default=[]): cv.multi_select(light_entity_ids),
@@ -3,7 +3,7 @@
 #-----------------------------------------------------------#
 
 from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_BRIGHTNESS_PCT, ATTR_KELVIN, ATTR_RGB_COLOR, VALID_BRIGHTNESS, VALID_BRIGHTNESS_PCT
-from homeassistant.const import CONF_DELAY, CONF_ID
+from homeassistant.const import CONF_DELAY, CONF_ENTITY_ID, CONF_ID
 from homeassistant.helpers import config_validation as cv
 import voluptuous as vol
 
@@ -14,9 +14,22 @@ import voluptuous as vol
 
 # ------ Configuration ---------------
 CONF_BLOCK_DURATION = "block_duration"
+CONF_BURST = "burst"
+CONF_COALESCE_WINDOW = "coalesce_window"
+CONF_COMMANDS = "commands"
 CONF_DURATION = "duration"
 CONF_LIGHT_GROUPS = "light_groups"
+CONF_JITTER = "jitter"
 CONF_LIGHTS = "lights"
+CONF_MANUAL_CONTROL_MODE = "manual_control_mode"
+CONF_MAX_CONCURRENT = "max_concurrent"
+CONF_MAX_IN_FLIGHT = "max_in_flight"
+CONF_PERFORMANCE_METRICS = "performance_metrics"
+CONF_PROFILES = "profiles"
+CONF_RATE = "rate"
+CONF_RESPONSE_TIMEOUT = "response_timeout"
+CONF_SPECULATIVE_REPLAY = "speculative_replay"
+CONF_STARTUP = "startup"
 CONF_STATUS = "status"
 
 # --- Attributes ----------
@@ -26,16 +39,52 @@ ATTR_UNTIL = "until"
 
 # ------ Defaults ---------------
 DEFAULT_BLOCK_DURATION = 300
+DEFAULT_COMMAND_BURST = 100
+DEFAULT_COMMAND_COALESCE_WINDOW = 0.05
+DEFAULT_COMMAND_MAX_IN_FLIGHT = 10
+DEFAULT_COMMAND_RATE = 50
+DEFAULT_MANUAL_CONTROL_MODE = "service_call"
+DEFAULT_RESPONSE_TIMEOUT = 0.5
+DEFAULT_STARTUP_JITTER = 0.5
+DEFAULT_STARTUP_MAX_CONCURRENT = 5
+
+# ------ Command Priorities ---------------
+PRIORITY_ACTIVE_TURN_ON = 0
+PRIORITY_IDLE_TURN_ON = 1
+PRIORITY_ACTIVE_TURN_OFF = 2
+PRIORITY_IDLE_TURN_OFF = 3
 
 # ------ Events ---------------
 EVENT_DATA_TYPE_REQUEST = "request"
 EVENT_DATA_TYPE_RESET = "reset"
 EVENT_TYPE_AUTOMATIC_LIGHTING = "automatic_lighting_event"
 
+# ------ Manual Control Modes ---------------
+MANUAL_CONTROL_MODE_SERVICE_CALL = "service_call"
+MANUAL_CONTROL_MODE_STATE_CHANGE = "state_change"
+MANUAL_CONTROL_MODES = [MANUAL_CONTROL_MODE_SERVICE_CALL, MANUAL_CONTROL_MODE_STATE_CHANGE]
+
 # ------ Services ---------------
+SERVICE_APPLY_PROFILES = "apply_profiles"
 SERVICE_BLOCK = "block"
 SERVICE_TRACK_LIGHTS = "track_lights"
 
+# ------ Statistics ---------------
+STAT_BLOCKS = "blocks"
+STAT_EVENTS_HANDLED = "events_handled"
+STAT_LIGHT_COMMANDS_SENT = "light_commands_sent"
+STAT_LIGHT_COMMANDS_SUPPRESSED = "light_commands_suppressed"
+STAT_LIGHT_MESSAGES_SAVED = "light_messages_saved"
+STAT_REQUESTS = "requests"
+STAT_RESETS = "resets"
+TIMING_BLOCK = "block"
+TIMING_MANUAL_CONTROL = "manual_control"
+TIMING_REQUEST = "request"
+TIMING_REQUEST_ROUND_TRIP = "request_round_trip"
+TIMING_RESET = "reset"
+TIMING_TURN_OFF_UNUSED_ENTITIES = "turn_off_unused_entities"
+TIMING_HANDLERS = [TIMING_BLOCK, TIMING_MANUAL_CONTROL, TIMING_REQUEST, TIMING_RESET, TIMING_TURN_OFF_UNUSED_ENTITIES]
+
 # ------ States ---------------
 STATUS_ACTIVE = "active"
 STATUS_BLOCKED = "blocked"
@@ -75,4 +124,11 @@ SERVICE_SCHEMA_TURN_ON = {
     vol.Optional(ATTR_BRIGHTNESS_PCT): VALID_BRIGHTNESS_PCT,
     vol.Optional(ATTR_KELVIN): VALID_KELVIN,
     vol.Optional(ATTR_RGB_COLOR): VALID_RGB_COLOR,
-}
\ No newline at end of file
+}
+
+SERVICE_SCHEMA_APPLY_PROFILES = vol.Schema({
+    vol.Required(CONF_PROFILES): vol.All(cv.ensure_list, [vol.Schema({
+        vol.Required(CONF_ENTITY_ID): cv.entity_id,
+        **SERVICE_SCHEMA_TURN_ON
+    })])
+})
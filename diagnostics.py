@@ -0,0 +1,33 @@
+# -----------------------------------------------------------#
+#       Imports
+# -----------------------------------------------------------#
+
+from . import COMMAND_SCHEDULER, DOMAIN, ENTITY, LIGHT_GROUP_INDEX, RELOAD_COORDINATOR, STARTUP_SCHEDULER, STATISTICS, TIMER_WHEEL
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from typing import Any, Dict
+
+
+# -----------------------------------------------------------#
+#       Diagnostics
+# -----------------------------------------------------------#
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, config_entry: ConfigEntry) -> Dict[str, Any]:
+    """ Returns the diagnostics of a config entry. """
+    data = hass.data[DOMAIN][config_entry.entry_id]
+    entity = data.get(ENTITY, None)
+    reload_coordinator = hass.data[DOMAIN][RELOAD_COORDINATOR]
+    diagnostics = {
+        "options": dict(config_entry.options),
+        "statistics": data[STATISTICS].as_dict(),
+        "command_scheduler": hass.data[DOMAIN][COMMAND_SCHEDULER].diagnostics,
+        "discovered_light_groups": len(hass.data[DOMAIN][LIGHT_GROUP_INDEX].groups),
+        "reload_coordinator": { "active": reload_coordinator.active, "queued": reload_coordinator.queued, "waves": reload_coordinator.waves },
+        "startup_scheduler": hass.data[DOMAIN][STARTUP_SCHEDULER].diagnostics,
+        "timer_wheel": hass.data[DOMAIN][TIMER_WHEEL].diagnostics
+    }
+
+    if entity is not None:
+        diagnostics["entity"] = entity.diagnostics
+
+    return diagnostics
@@ -0,0 +1,191 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from collections import OrderedDict
+from homeassistant.components.automation import DOMAIN as AUTOMATION_DOMAIN, EVENT_AUTOMATION_RELOADED, EVENT_AUTOMATION_TRIGGERED
+from homeassistant.const import ATTR_DOMAIN, ATTR_SERVICE, CONF_ENTITY_ID, EVENT_CALL_SERVICE, EVENT_STATE_CHANGED, SERVICE_RELOAD
+from homeassistant.core import Context, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_added_domain, async_track_state_change_event, async_track_state_removed_domain
+from typing import Any, Callable, Dict, List, Set, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+CONF_NEW_STATE = "new_state"
+CONF_OLD_STATE = "old_state"
+TRIGGERED_CONTEXTS_SIZE = 256
+
+
+#-----------------------------------------------------------#
+#       AutomationTracker
+#-----------------------------------------------------------#
+
+class AutomationTracker:
+    """ Tracks automation state changes and reloads, reporting a state change only to the subscribers the automation is known to serve. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._actions             : Dict[Any, Callable[[str, Any], None]]  = {}
+        self._entity_listeners    : Dict[str, Callable]                    = {}
+        self._listeners           : List[Callable]                         = []
+        self._pending_responders  : OrderedDict                            = OrderedDict()
+        self._reloading           : bool                                   = False
+        self._served_subscribers  : Dict[str, Set[Any]]                    = {}
+        self._triggered_contexts  : OrderedDict                            = OrderedDict()
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    @callback
+    def async_add_responder(self, key: Any, context: Context) -> None:
+        """ Registers the automation that made a service call with the context as serving the subscriber identified by key, once its triggered event is seen. """
+        entity_id = self.automation_from_context(context)
+
+        if entity_id is not None:
+            self._served_subscribers.setdefault(entity_id, set()).add(key)
+            return
+
+        if context is not None:
+            self._pending_responders.setdefault(context.id, set()).add(key)
+
+            if len(self._pending_responders) > TRIGGERED_CONTEXTS_SIZE:
+                self._pending_responders.popitem(last=False)
+
+    @callback
+    def async_stop(self) -> None:
+        """ Removes all subscribers and listeners. """
+        self._actions.clear()
+        self._served_subscribers.clear()
+        self._stop_listening()
+
+    @callback
+    def async_track(self, key: Any, action: Callable[[str, Any], None]) -> Callable[[], None]:
+        """ Tracks automation changes (state changes, reloaded event) for the subscriber identified by key. Returns a callable that removes the subscription. """
+        self._actions[key] = action
+
+        if not self._listeners:
+            self._start_listening()
+
+        def remove() -> None:
+            if self._actions.get(key, None) == action:
+                self._actions.pop(key)
+
+            if not self._actions:
+                self._stop_listening()
+
+        return remove
+
+    def automation_from_context(self, context: Context) -> Union[str, None]:
+        """ Gets the entity id of the automation whose run created the context (or its parent). """
+        if context is None:
+            return None
+
+        return self._triggered_contexts.get(context.id, None) or self._triggered_contexts.get(context.parent_id, None)
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    async def _async_notify(self, event_type: str, entity_id: Any) -> None:
+        """ Notifies the subscribers served by the automation of a change, or all subscribers if it is not known which it serves. """
+        keys = self._served_subscribers.get(entity_id, None) if event_type == EVENT_STATE_CHANGED else None
+        actions = [self._actions[key] for key in keys if key in self._actions] if keys else list(self._actions.values())
+
+        for action in actions:
+            await action(event_type, entity_id)
+
+    def _start_listening(self) -> None:
+        """ Sets up the listeners for the automation domain and each automation entity. """
+        self._listeners.append(self._hass.bus.async_listen(EVENT_AUTOMATION_RELOADED, self._async_on_automation_reloaded))
+        self._listeners.append(self._hass.bus.async_listen(EVENT_AUTOMATION_TRIGGERED, self._async_on_automation_triggered))
+        self._listeners.append(self._hass.bus.async_listen(EVENT_CALL_SERVICE, self._async_on_service_call))
+        self._listeners.append(async_track_state_added_domain(self._hass, AUTOMATION_DOMAIN, self._async_on_automation_added))
+        self._listeners.append(async_track_state_removed_domain(self._hass, AUTOMATION_DOMAIN, self._async_on_automation_removed))
+
+        for entity_id in self._hass.states.async_entity_ids(AUTOMATION_DOMAIN):
+            self._track_entity(entity_id)
+
+    def _stop_listening(self) -> None:
+        """ Removes all listeners. """
+        while self._listeners:
+            self._listeners.pop()()
+
+        while self._entity_listeners:
+            self._entity_listeners.popitem()[1]()
+
+        self._reloading = False
+        self._pending_responders.clear()
+        self._triggered_contexts.clear()
+
+    def _track_entity(self, entity_id: str) -> None:
+        """ Starts tracking the state changes of an automation entity. """
+        if entity_id not in self._entity_listeners:
+            self._entity_listeners[entity_id] = async_track_state_change_event(self._hass, entity_id, self._async_on_state_changed)
+
+
+    #--------------------------------------------#
+    #       Event Handlers
+    #--------------------------------------------#
+
+    @callback
+    def _async_on_automation_added(self, event: Event) -> None:
+        """ Triggered when an automation entity has been added. """
+        self._track_entity(event.data.get(CONF_ENTITY_ID))
+
+    async def _async_on_automation_reloaded(self, event: Event) -> None:
+        """ Triggered when the automations have been reloaded. """
+        self._reloading = False
+        await self._async_notify(EVENT_AUTOMATION_RELOADED, [])
+
+    @callback
+    def _async_on_automation_triggered(self, event: Event) -> None:
+        """ Triggered when an automation has been triggered, remembering the context of its run. """
+        entity_id = event.data.get(CONF_ENTITY_ID)
+        self._triggered_contexts[event.context.id] = entity_id
+
+        keys = self._pending_responders.pop(event.context.id, None)
+
+        if keys:
+            self._served_subscribers.setdefault(entity_id, set()).update(keys)
+
+        if len(self._triggered_contexts) > TRIGGERED_CONTEXTS_SIZE:
+            self._triggered_contexts.popitem(last=False)
+
+    @callback
+    def _async_on_automation_removed(self, event: Event) -> None:
+        """ Triggered when an automation entity has been removed. """
+        remove_listener = self._entity_listeners.pop(event.data.get(CONF_ENTITY_ID), None)
+
+        if remove_listener:
+            remove_listener()
+
+    @callback
+    def _async_on_service_call(self, event: Event) -> None:
+        """ Triggered when a call_service event is fired. """
+        if event.data.get(ATTR_DOMAIN, None) == AUTOMATION_DOMAIN and event.data.get(ATTR_SERVICE, None) == SERVICE_RELOAD:
+            self._reloading = True
+
+    async def _async_on_state_changed(self, event: Event) -> None:
+        """ Triggered when the state of a tracked automation entity changes. """
+        if self._reloading:
+            return
+
+        old_state = event.data.get(CONF_OLD_STATE, None)
+        new_state = event.data.get(CONF_NEW_STATE, None)
+
+        if old_state is None or new_state is None:
+            return
+
+        if old_state.state == new_state.state:
+            return
+
+        await self._async_notify(EVENT_STATE_CHANGED, event.data.get(CONF_ENTITY_ID))
@@ -0,0 +1,324 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from asyncio import TimerHandle
+from collections import OrderedDict
+from heapq import heappop, heappush
+from homeassistant.const import CONF_ENTITY_ID
+from homeassistant.core import Context, HomeAssistant, callback
+from itertools import count
+from logging import Logger
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+CONFIRM_TIMEOUT = 2
+
+
+#-----------------------------------------------------------#
+#       Command
+#-----------------------------------------------------------#
+
+class Command:
+    """ A light service call waiting in the command scheduler. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, domain: str, service: str, entity_ids: List[str], attributes: Dict[str, Any], context: Context, priority: int, queued_at: float, on_send: Union[Callable[[List[str]], None], None]):
+        self.attributes = attributes
+        self.context = context
+        self.domain = domain
+        self.entity_ids = entity_ids
+        self.priority = priority
+        self.queued_at = queued_at
+        self.senders : List[Tuple[Callable[[List[str]], None], List[str]]] = [(on_send, list(entity_ids))] if on_send else []
+        self.service = service
+
+
+#-----------------------------------------------------------#
+#       CommandScheduler
+#-----------------------------------------------------------#
+
+class CommandScheduler:
+    """ Sends the light commands of all switches in priority order, rate limited by a token bucket (one token per light). """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant, logger: Logger, rate: float, burst: int, max_in_flight: int, coalesce_window: float = 0):
+        self._hass = hass
+        self._logger = logger
+        self._burst           : int                        = burst
+        self._coalesce_window : float                      = coalesce_window
+        self._counter                                      = count()
+        self._flush_handle    : Union[TimerHandle, None]   = None
+        self._handle          : Union[TimerHandle, None]   = None
+        self._in_flight       : int                        = 0
+        self._max_in_flight   : int                        = max_in_flight
+        self._paused          : int                        = 0
+        self._queue           : List[list]                 = []
+        self._rate            : float                      = rate
+        self._slots           : Dict[str, Command]         = {}
+        self._staged          : List[list]                 = []
+        self._tokens          : float                      = burst
+        self._unconfirmed     : OrderedDict                = OrderedDict()
+        self._updated_at      : float                      = hass.loop.time()
+
+        # --- Metrics ----------
+        self._dispatched     : int    = 0
+        self._failed         : int    = 0
+        self._merged         : int    = 0
+        self._peak_in_flight : int    = 0
+        self._peak_queued    : int    = 0
+        self._sent           : int    = 0
+        self._superseded     : int    = 0
+        self._total_wait     : float  = 0
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def diagnostics(self) -> Dict[str, Any]:
+        """ Gets a dict describing the state of the scheduler, for the diagnostics download. """
+        return {
+            "rate": self._rate,
+            "burst": self._burst,
+            "max_in_flight": self._max_in_flight,
+            "coalesce_window": self._coalesce_window,
+            "queued": len(self._staged) + len(self._queue),
+            "peak_queued": self._peak_queued,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "sent": self._sent,
+            "failed": self._failed,
+            "superseded": self._superseded,
+            "merged": self._merged,
+            "average_wait": round(self._total_wait / self._dispatched, 3) if self._dispatched else None
+        }
+
+    @property
+    def is_idle(self) -> bool:
+        """ Gets a boolean indicating whether no command is staged, queued or in flight. """
+        return not self._staged and not self._queue and not self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """ Gets the number of staged and queued commands. """
+        return len(self._staged) + len(self._queue)
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    @callback
+    def async_discard(self, entity_ids: Iterable[str]) -> None:
+        """ Drops the pending commands of the lights, e.g. because they are being controlled manually. """
+        for entity_id in entity_ids:
+            self._slots.pop(entity_id, None)
+
+    def is_pending(self, entity_id: str) -> bool:
+        """ Determines whether a light has a command that is queued, or sent but not yet reported by the light. """
+        if entity_id in self._slots:
+            return True
+
+        if entity_id not in self._unconfirmed:
+            return False
+
+        context, sent_at = self._unconfirmed[entity_id]
+        state = self._hass.states.get(entity_id)
+
+        if self._hass.loop.time() - sent_at > CONFIRM_TIMEOUT or (state is not None and context.id in (state.context.id, state.context.parent_id)):
+            self._unconfirmed.pop(entity_id)
+            return False
+
+        return True
+
+    def pending_priority(self, entity_ids: Iterable[str]) -> Union[int, None]:
+        """ Gets the highest priority value of the queued commands of the lights, or None if none is queued. """
+        return max((self._slots[entity_id].priority for entity_id in entity_ids if entity_id in self._slots), default=None)
+
+    @callback
+    def async_pause(self) -> None:
+        """ Holds the staged commands until async_resume is called as many times. """
+        self._paused += 1
+
+    @callback
+    def async_resume(self) -> None:
+        """ Releases a hold taken by async_pause, flushing the staged commands when the last hold is released. """
+        self._paused = max(self._paused - 1, 0)
+
+        if not self._paused and self._staged and self._flush_handle is None:
+            self._flush()
+
+    @callback
+    def async_stop(self) -> None:
+        """ Drops all staged and queued commands. """
+        for handle in (self._flush_handle, self._handle):
+            if handle:
+                handle.cancel()
+
+        self._flush_handle = None
+        self._handle = None
+        self._paused = 0
+        self._queue.clear()
+        self._unconfirmed.clear()
+        self._slots.clear()
+        self._staged.clear()
+
+    @callback
+    def async_submit(self, domain: str, service: str, service_data: Dict[str, Any], context: Context, priority: int, on_send: Callable[[List[str]], None] = None) -> None:
+        """ Stages a service call, taking over the pending slots of its lights, and calls on_send with the lights that are actually sent. """
+        service_data = dict(service_data)
+        entity_ids = service_data.pop(CONF_ENTITY_ID, [])
+        entity_ids = [entity_ids] if isinstance(entity_ids, str) else list(entity_ids)
+        command = Command(domain, service, entity_ids, service_data, context, priority, self._hass.loop.time(), on_send)
+
+        for entity_id in entity_ids:
+            if entity_id in self._slots:
+                self._superseded += 1
+
+            self._slots[entity_id] = command
+
+        self._staged.append([priority, next(self._counter), command])
+
+        if self._paused:
+            return
+
+        if self._coalesce_window <= 0:
+            return self._flush()
+
+        if self._flush_handle is None:
+            self._flush_handle = self._hass.loop.call_later(self._coalesce_window, self._flush)
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _flush(self) -> None:
+        """ Moves the staged commands to the queue, merging the commands that can be sent as one call. """
+        self._flush_handle = None
+
+        if self._paused:
+            return
+
+        for node in self._merge(self._staged):
+            heappush(self._queue, node)
+
+        self._staged.clear()
+        self._peak_queued = max(self._peak_queued, len(self._queue))
+        self._pump()
+
+    def _live_entity_ids(self, command: Command) -> List[str]:
+        """ Gets the lights of a command that have not been superseded by a later command. """
+        return [entity_id for entity_id in command.entity_ids if self._slots.get(entity_id, None) is command]
+
+    def _merge(self, nodes: List[list]) -> List[list]:
+        """ Merges commands with the same priority, service, attributes and context, up to a burst of lights per command. """
+        if len(nodes) < 2:
+            return nodes
+
+        merged = []
+        targets = {}
+
+        for node in nodes:
+            priority, _, command = node
+
+            if not command.entity_ids:
+                merged.append(node)
+                continue
+
+            key = (priority, command.domain, command.service, command.context.id, repr(sorted(command.attributes.items())))
+            target = targets.setdefault(key, command)
+
+            if target is not command and len(target.entity_ids) + len(command.entity_ids) > self._burst:
+                target = targets[key] = command
+
+            if target is command:
+                merged.append(node)
+                continue
+
+            for entity_id in command.entity_ids:
+                if self._slots.get(entity_id, None) is command:
+                    self._slots[entity_id] = target
+
+                if entity_id not in target.entity_ids:
+                    target.entity_ids.append(entity_id)
+
+            target.senders.extend(command.senders)
+            self._merged += 1
+
+        return merged
+
+    def _pump(self) -> None:
+        """ Sends queued commands while tokens and in-flight slots are available, otherwise waits for the bucket to refill. """
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+
+        now = self._hass.loop.time()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+        while self._queue and self._in_flight < self._max_in_flight:
+            command = self._queue[0][2]
+            entity_ids = self._live_entity_ids(command)
+
+            if command.entity_ids and not entity_ids:
+                heappop(self._queue)
+                continue
+
+            cost = min(max(len(entity_ids), 1), self._burst)
+
+            if self._tokens < cost:
+                self._handle = self._hass.loop.call_later((cost - self._tokens) / self._rate, self._pump)
+                return
+
+            heappop(self._queue)
+
+            for entity_id in entity_ids:
+                self._slots.pop(entity_id)
+                self._unconfirmed[entity_id] = (command.context, now)
+                self._unconfirmed.move_to_end(entity_id)
+
+            while self._unconfirmed and now - next(iter(self._unconfirmed.values()))[1] > CONFIRM_TIMEOUT:
+                self._unconfirmed.popitem(last=False)
+
+            command.entity_ids = entity_ids
+            self._tokens -= cost
+            self._dispatched += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            self._total_wait += now - command.queued_at
+
+            sent = set(entity_ids)
+
+            for on_send, sender_entity_ids in command.senders:
+                on_send([entity_id for entity_id in sender_entity_ids if entity_id in sent])
+
+            self._hass.async_create_task(self._async_send(command))
+
+    async def _async_send(self, command: Command) -> None:
+        """ Sends a command and waits for it to finish, releasing its in-flight slot afterwards. """
+        try:
+            service_data = { CONF_ENTITY_ID: command.entity_ids, **command.attributes } if command.entity_ids else command.attributes
+            await self._hass.services.async_call(command.domain, command.service, service_data, blocking=True, context=command.context)
+            self._sent += 1
+        except Exception as e:
+            self._failed += 1
+
+            for entity_id in command.entity_ids:
+                self._unconfirmed.pop(entity_id, None)
+
+            self._logger.warning(f"Error calling {command.domain}.{command.service} for {command.entity_ids}: {e}")
+        finally:
+            self._in_flight -= 1
+            self._pump()
@@ -0,0 +1,80 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from collections import OrderedDict
+from homeassistant.core import Context
+from time import monotonic
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+CONTEXT_LIFETIME = 60
+CONTEXT_REGISTRY_SIZE = 512
+
+
+#-----------------------------------------------------------#
+#       ContextRegistry
+#-----------------------------------------------------------#
+
+class ContextRegistry:
+    """ Remembers the contexts issued by an entity for a limited time, so contexts (and contexts derived from them) can be classified as internal with a hash lookup. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, lifetime: float = CONTEXT_LIFETIME, max_size: int = CONTEXT_REGISTRY_SIZE):
+        self._contexts : OrderedDict = OrderedDict()
+        self._lifetime : float       = lifetime
+        self._max_size : int         = max_size
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def size(self) -> int:
+        """ Gets the number of remembered contexts. """
+        return len(self._contexts)
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def create(self) -> Context:
+        """ Creates a new context and remembers it as issued. """
+        context = Context()
+        self.register(context)
+        return context
+
+    def is_internal(self, context: Context) -> bool:
+        """ Determines whether the context, or the context it was derived from, was issued within the lifetime. """
+        return self._is_known(context.id) or (context.parent_id is not None and self._is_known(context.parent_id))
+
+    def register(self, context: Context) -> None:
+        """ Remembers a context as issued, evicting the contexts that have expired or exceed the size. """
+        now = monotonic()
+        self._contexts[context.id] = now
+        self._contexts.move_to_end(context.id)
+
+        while self._contexts:
+            id, issued_at = next(iter(self._contexts.items()))
+
+            if len(self._contexts) <= self._max_size and now - issued_at <= self._lifetime:
+                break
+
+            self._contexts.popitem(last=False)
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _is_known(self, id: str) -> bool:
+        """ Determines whether a context id was issued within the lifetime. """
+        issued_at = self._contexts.get(id, None)
+        return issued_at is not None and monotonic() - issued_at <= self._lifetime
@@ -2,10 +2,11 @@
 #       Imports
 #-----------------------------------------------------------#
 
+from .context_registry import ContextRegistry
+from collections import OrderedDict
 from homeassistant.core import Context
 from homeassistant.helpers.entity import Entity
 from homeassistant.helpers.template import is_template_string, Template
-from homeassistant.util import get_random_string
 from logging import Logger
 from typing import Any, Dict
 
@@ -14,7 +15,7 @@ from typing import Any, Dict
 #       Constants
 #-----------------------------------------------------------#
 
-CONTEXT_MAX_LENGTH = 36
+TEMPLATE_CACHE_SIZE = 64
 
 
 #-----------------------------------------------------------#
@@ -28,8 +29,11 @@ class EntityBase(Entity):
     #--------------------------------------------#
 
     def __init__(self, logger: Logger):
-        self._context_unique_id = get_random_string(6)
         self._logger = logger
+        self._context_registry      : ContextRegistry  = ContextRegistry()
+        self._template_cache        : OrderedDict      = OrderedDict()
+        self._template_cache_hits   : int              = 0
+        self._template_cache_misses : int              = 0
 
 
     #--------------------------------------------#
@@ -41,6 +45,16 @@ class EntityBase(Entity):
         """ Gets the logger. """
         return self._logger
 
+    @property
+    def template_cache_hits(self) -> int:
+        """ Gets the number of templates that were rendered using a cached template. """
+        return self._template_cache_hits
+
+    @property
+    def template_cache_misses(self) -> int:
+        """ Gets the number of templates that had to be compiled before being rendered. """
+        return self._template_cache_misses
+
 
     #--------------------------------------------#
     #       Context Methods
@@ -48,29 +62,23 @@ class EntityBase(Entity):
 
     def create_context(self) -> Context:
         """ Creates a new context. """
-        return Context(id=f"{self._context_unique_id}{get_random_string(CONTEXT_MAX_LENGTH)}"[:CONTEXT_MAX_LENGTH])
+        return self._context_registry.create()
 
     def is_context_internal(self, context: Context) -> bool:
-        """ Determines whether the context is of internal origin (created by the class instance). """
-        return context.id.startswith(self._context_unique_id)
+        """ Determines whether the context is of internal origin (created by the class instance, or derived from a context it created). """
+        return self._context_registry.is_internal(context)
 
 
     #--------------------------------------------#
     #       Action Methods
     #--------------------------------------------#
 
-    def call_service(self, domain: str, service: str, **service_data: Any) -> None:
-        """ Calls a service. """
-        context = self.create_context()
-        #self.async_set_context(context)
-        parsed_service_data = self._parse_service_data(service_data)
-        self.hass.async_create_task(self.hass.services.async_call(domain, service, { **parsed_service_data }, context=context))
-
-    def fire_event(self, event_type: str, **event_data: Any) -> None:
-        """ Fires an event using the Home Assistant event bus. """
+    def fire_event(self, event_type: str, **event_data: Any) -> Context:
+        """ Fires an event using the Home Assistant event bus. Returns the context of the event. """
         context = self.create_context()
         #self.async_set_context(context)
         self.hass.bus.async_fire(event_type, event_data, context=context)
+        return context
 
 
     #--------------------------------------------#
@@ -84,7 +92,7 @@ class EntityBase(Entity):
         for key, value in service_data.items():
             if isinstance(value, str) and is_template_string(value):
                 try:
-                    template = Template(value, self._hass)
+                    template = self._get_template(value)
                     result[key] = template.async_render()
                 except Exception as e:
                     self._logger.warn(f"Error parsing {key} in service_data {service_data}: Invalid template was given -> {value}.")
@@ -92,4 +100,23 @@ class EntityBase(Entity):
             else:
                 result[key] = value
 
-        return result
\ No newline at end of file
+        return result
+
+    def _get_template(self, source: str) -> Template:
+        """ Gets the compiled template of the source from the bounded least recently used cache, compiling it on a miss. """
+        template = self._template_cache.get(source, None)
+
+        if template is not None:
+            self._template_cache_hits += 1
+            self._template_cache.move_to_end(source)
+            return template
+
+        self._template_cache_misses += 1
+        template = Template(source, self.hass)
+        template.ensure_valid()
+        self._template_cache[source] = template
+
+        if len(self._template_cache) > TEMPLATE_CACHE_SIZE:
+            self._template_cache.popitem(last=False)
+
+        return template
\ No newline at end of file
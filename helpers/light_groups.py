@@ -0,0 +1,293 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from homeassistant.components.group import DOMAIN as GROUP_DOMAIN
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID, EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Set, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+CONF_ACTION = "action"
+CONF_NEW_STATE = "new_state"
+CONF_OLD_ENTITY_ID = "old_entity_id"
+CONF_OLD_STATE = "old_state"
+DISCOVERY_DOMAINS = (LIGHT_DOMAIN, GROUP_DOMAIN)
+DISCOVERY_PREFIXES = tuple(f"{domain}." for domain in DISCOVERY_DOMAINS)
+LIGHT_PREFIX = f"{LIGHT_DOMAIN}."
+REGISTRY_ACTION_REMOVE = "remove"
+
+
+#-----------------------------------------------------------#
+#       LightGroupTopology
+#-----------------------------------------------------------#
+
+class LightGroupTopology:
+    """ Holds the membership between light groups and their member lights, and plans commands using set algebra. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, light_groups: Dict[str, Iterable[str]]):
+        self._group_members  : Dict[str, FrozenSet[str]] = {}
+        self._member_groups  : Dict[str, FrozenSet[str]] = {}
+        self.update(light_groups)
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def groups(self) -> FrozenSet[str]:
+        """ Gets the entity ids of all light groups. """
+        return frozenset(self._group_members.keys())
+
+    @property
+    def members(self) -> FrozenSet[str]:
+        """ Gets the entity ids of all lights that are a member of at least one light group. """
+        return frozenset(self._member_groups.keys())
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def as_dict(self) -> Dict[str, FrozenSet[str]]:
+        """ Gets the light groups and their members. """
+        return dict(self._group_members)
+
+    def compress(self, entity_ids: Iterable[str]) -> List[str]:
+        """ Gets the minimal set of light groups and leftover lights that targets exactly the same lights as the entities, so a command is sent as few messages as possible. """
+        entity_ids = set(entity_ids)
+        groups = { entity_id for entity_id in entity_ids if entity_id in self._group_members }
+        covered = set().union(*(self._group_members[group] for group in groups))
+        remaining = entity_ids - groups - covered
+        targeted = remaining | covered
+        candidates = { group for member in remaining for group in self._member_groups.get(member, ()) if group not in groups and self._group_members[group] <= targeted }
+
+        while candidates:
+            group = max(candidates, key=lambda group: (len(self._group_members[group] & remaining), group))
+
+            if len(self._group_members[group] & remaining) < 2:
+                break
+
+            candidates.discard(group)
+            groups.add(group)
+            remaining -= self._group_members[group]
+
+        return sorted(groups | remaining)
+
+    def expand(self, entity_ids: Iterable[str]) -> Set[str]:
+        """ Gets the lights targeted by the entities, replacing light groups with their members. """
+        result = set()
+
+        for entity_id in entity_ids:
+            result |= self._group_members.get(entity_id, { entity_id })
+
+        return result
+
+    def groups_of(self, entity_id: str) -> FrozenSet[str]:
+        """ Gets the light groups the entity is a member of. """
+        return self._member_groups.get(entity_id, frozenset())
+
+    def is_group(self, entity_id: str) -> bool:
+        """ Determines whether the entity is a light group. """
+        return entity_id in self._group_members
+
+    def members_of(self, entity_id: str) -> FrozenSet[str]:
+        """ Gets the members of a light group. """
+        return self._group_members.get(entity_id, frozenset())
+
+    def update(self, light_groups: Dict[str, Iterable[str]]) -> Set[str]:
+        """ Updates the topology to the light groups, touching only the groups that changed. Returns the entity ids of the changed groups. """
+        group_members = { group: frozenset(members) for group, members in light_groups.items() }
+        changed_groups = { group for group in self._group_members.keys() | group_members.keys() if self._group_members.get(group, None) != group_members.get(group, None) }
+
+        if not changed_groups:
+            return changed_groups
+
+        affected_members: Set[str] = set()
+
+        for group in changed_groups:
+            affected_members |= self._group_members.get(group, frozenset())
+            affected_members |= group_members.get(group, frozenset())
+
+            if group in group_members:
+                self._group_members[group] = group_members[group]
+            else:
+                self._group_members.pop(group)
+
+        for member in affected_members:
+            groups = frozenset(group for group in (self._member_groups.get(member, frozenset()) | changed_groups) if member in self._group_members.get(group, frozenset()))
+
+            if groups:
+                self._member_groups[member] = groups
+            else:
+                self._member_groups.pop(member, None)
+
+        return changed_groups
+
+    def plan_turn_off(self, old_entity_ids: Iterable[str], new_entity_ids: Iterable[str]) -> List[str]:
+        """ Gets the entities to turn off when going from the old entities to the new entities: the old light groups with no member in use, and the other unused lights. """
+        old_entity_ids = set(old_entity_ids)
+        new_lights = self.expand(new_entity_ids) | set(new_entity_ids)
+        unused_lights = self.expand(old_entity_ids) - new_lights
+        unused_groups = { entity_id for entity_id in old_entity_ids if entity_id in self._group_members and entity_id not in new_lights and self._group_members[entity_id].isdisjoint(new_lights) }
+        covered_members = set().union(*(self._group_members[group] for group in unused_groups))
+        return sorted(unused_groups | (unused_lights - covered_members))
+
+
+#-----------------------------------------------------------#
+#       LightGroupIndex
+#-----------------------------------------------------------#
+
+class LightGroupIndex:
+    """ Discovers light groups from the entity_id attribute of light and group entities, keeping the membership cached and updated from state and registry changes. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._actions   : Dict[Any, Callable[[Set[str]], None]]  = {}
+        self._groups    : Dict[str, FrozenSet[str]]              = {}
+        self._listeners : List[Callable]                         = []
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def groups(self) -> Dict[str, FrozenSet[str]]:
+        """ Gets the discovered light groups and their member lights. """
+        return self._groups
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    @callback
+    def async_stop(self) -> None:
+        """ Removes all subscribers and listeners. """
+        self._actions.clear()
+        self._stop_listening()
+
+    @callback
+    def async_track(self, key: Any, action: Callable[[Set[str]], None]) -> Callable[[], None]:
+        """ Notifies the subscriber identified by key of the light groups whose membership changed. Returns a callable that removes the subscription. """
+        self._actions[key] = action
+
+        if not self._listeners:
+            self._start_listening()
+
+        def remove() -> None:
+            if self._actions.get(key, None) == action:
+                self._actions.pop(key)
+
+            if not self._actions:
+                self._stop_listening()
+
+        return remove
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _notify(self, changed_groups: Set[str]) -> None:
+        """ Notifies the subscribers of the changed light groups. """
+        for action in list(self._actions.values()):
+            action(changed_groups)
+
+    def _set_members(self, entity_id: str, state: Union[State, None]) -> bool:
+        """ Updates the members of a light group from its state. Returns a boolean indicating whether the membership changed. """
+        members = _members_of(entity_id, state)
+
+        if members == self._groups.get(entity_id, None):
+            return False
+
+        if members:
+            self._groups[entity_id] = members
+        else:
+            self._groups.pop(entity_id, None)
+
+        return True
+
+    def _start_listening(self) -> None:
+        """ Discovers the current light groups and sets up the state and registry listeners. """
+        for state in self._hass.states.async_all(DISCOVERY_DOMAINS):
+            self._set_members(state.entity_id, state)
+
+        self._listeners.append(self._hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_on_state_changed, event_filter=_is_group_state_change))
+        self._listeners.append(self._hass.bus.async_listen(EVENT_ENTITY_REGISTRY_UPDATED, self._async_on_registry_updated))
+
+    def _stop_listening(self) -> None:
+        """ Removes all listeners and forgets the discovered light groups. """
+        while self._listeners:
+            self._listeners.pop()()
+
+        self._groups = {}
+
+
+    #--------------------------------------------#
+    #       Event Handlers
+    #--------------------------------------------#
+
+    @callback
+    def _async_on_registry_updated(self, event: Event) -> None:
+        """ Triggered when the entity registry is updated, forgetting light groups that were removed or renamed. """
+        if event.data.get(CONF_ACTION) == REGISTRY_ACTION_REMOVE:
+            entity_id = event.data.get(ATTR_ENTITY_ID)
+        else:
+            entity_id = event.data.get(CONF_OLD_ENTITY_ID, None)
+
+        if entity_id in self._groups:
+            self._groups.pop(entity_id)
+            self._notify({ entity_id })
+
+    @callback
+    def _async_on_state_changed(self, event: Event) -> None:
+        """ Triggered when the state of a light or group entity with an entity_id attribute changes. """
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+
+        if self._set_members(entity_id, event.data.get(CONF_NEW_STATE)):
+            self._notify({ entity_id })
+
+
+#-----------------------------------------------------------#
+#       Helpers
+#-----------------------------------------------------------#
+
+@callback
+def _is_group_state_change(event: Event) -> bool:
+    """ Determines whether a state change is of a light or group entity that is (or was) a group, without looking further at the event. """
+    if not event.data.get(ATTR_ENTITY_ID, "").startswith(DISCOVERY_PREFIXES):
+        return False
+
+    old_state = event.data.get(CONF_OLD_STATE)
+    new_state = event.data.get(CONF_NEW_STATE)
+    return (old_state is not None and ATTR_ENTITY_ID in old_state.attributes) or (new_state is not None and ATTR_ENTITY_ID in new_state.attributes)
+
+def _members_of(entity_id: str, state: Union[State, None]) -> FrozenSet[str]:
+    """ Gets the member lights listed in the entity_id attribute of a state. """
+    if state is None:
+        return frozenset()
+
+    members = state.attributes.get(ATTR_ENTITY_ID, None)
+
+    if isinstance(members, str):
+        members = [members]
+
+    if not isinstance(members, (list, tuple)):
+        return frozenset()
+
+    return frozenset(member for member in members if isinstance(member, str) and member.startswith(LIGHT_PREFIX) and member != entity_id)
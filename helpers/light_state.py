@@ -0,0 +1,167 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_BRIGHTNESS_PCT, ATTR_COLOR_TEMP, ATTR_KELVIN, ATTR_RGB_COLOR
+from homeassistant.const import CONF_ENTITY_ID, STATE_ON
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util.color import color_temperature_mired_to_kelvin
+from typing import Any, Callable, Dict, Iterable, Set, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+BRIGHTNESS_TOLERANCE = 2
+CONF_NEW_STATE = "new_state"
+KELVIN_TOLERANCE = 50
+RGB_COLOR_TOLERANCE = 3
+
+
+#-----------------------------------------------------------#
+#       LightStateMirror
+#-----------------------------------------------------------#
+
+class LightStateMirror:
+    """ Keeps a mirror of the current state of the tracked lights, updated from their state change events. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._listeners     : Dict[str, Callable]  = {}
+        self._states        : Dict[str, State]     = {}
+        self._subscriptions : Dict[Any, Set[str]]  = {}
+        self._subscribers   : Dict[str, int]       = {}
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def get(self, entity_id: str) -> Union[State, None]:
+        """ Gets the current state of a light, falling back to the state machine for lights that are not tracked. """
+        if entity_id in self._listeners:
+            return self._states.get(entity_id, None)
+
+        return self._hass.states.get(entity_id)
+
+    def is_on(self, entity_id: str) -> bool:
+        """ Determines whether a light is turned on. """
+        state = self.get(entity_id)
+        return state is not None and state.state == STATE_ON
+
+    def matches(self, entity_id: str, attributes: Dict[str, Any]) -> bool:
+        """ Determines whether a light is turned on with attributes matching those of a turn_on call (within a tolerance). """
+        state = self.get(entity_id)
+
+        if state is None or state.state != STATE_ON:
+            return False
+
+        for key, value in attributes.items():
+            if key == ATTR_BRIGHTNESS:
+                if not _within(state.attributes.get(ATTR_BRIGHTNESS), value, BRIGHTNESS_TOLERANCE):
+                    return False
+            elif key == ATTR_BRIGHTNESS_PCT:
+                if not _within(state.attributes.get(ATTR_BRIGHTNESS), round(value * 255 / 100), BRIGHTNESS_TOLERANCE):
+                    return False
+            elif key == ATTR_KELVIN:
+                color_temp = state.attributes.get(ATTR_COLOR_TEMP)
+                if not color_temp or not _within(color_temperature_mired_to_kelvin(color_temp), value, KELVIN_TOLERANCE):
+                    return False
+            elif key == ATTR_RGB_COLOR:
+                rgb_color = state.attributes.get(ATTR_RGB_COLOR)
+                if not rgb_color or len(rgb_color) != len(value) or not all(_within(a, b, RGB_COLOR_TOLERANCE) for a, b in zip(rgb_color, value)):
+                    return False
+            else:
+                return False
+
+        return True
+
+    @callback
+    def async_stop(self) -> None:
+        """ Removes all subscriptions and state listeners. """
+        for key in list(self._subscriptions.keys()):
+            self.async_untrack(key)
+
+    @callback
+    def async_track(self, key: Any, entity_ids: Iterable[str]) -> Callable[[], None]:
+        """ Mirrors the state of the entities for the subscriber identified by key. Returns a callable that removes the subscription. """
+        self.async_untrack(key)
+        self._subscriptions[key] = set()
+        self.async_update(key, entity_ids)
+        return lambda: self.async_untrack(key)
+
+    @callback
+    def async_untrack(self, key: Any) -> None:
+        """ Removes the subscription identified by key. """
+        entity_ids = self._subscriptions.pop(key, None)
+
+        if entity_ids is not None:
+            self._release(entity_ids)
+
+    @callback
+    def async_update(self, key: Any, entity_ids: Iterable[str]) -> None:
+        """ Replaces the mirrored entities of the subscriber identified by key. """
+        old_entity_ids = self._subscriptions.get(key, None)
+
+        if old_entity_ids is None:
+            return
+
+        entity_ids = set(entity_ids)
+        self._release(old_entity_ids - entity_ids)
+        self._acquire(entity_ids - old_entity_ids)
+        self._subscriptions[key] = entity_ids
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _acquire(self, entity_ids: Iterable[str]) -> None:
+        """ Starts mirroring the entities, if not already mirrored for another subscriber. """
+        for entity_id in entity_ids:
+            self._subscribers[entity_id] = self._subscribers.get(entity_id, 0) + 1
+
+            if entity_id in self._listeners:
+                continue
+
+            self._states[entity_id] = self._hass.states.get(entity_id)
+            self._listeners[entity_id] = async_track_state_change_event(self._hass, entity_id, self._async_on_state_changed)
+
+    def _release(self, entity_ids: Iterable[str]) -> None:
+        """ Stops mirroring the entities, if no other subscriber needs them. """
+        for entity_id in entity_ids:
+            self._subscribers[entity_id] -= 1
+
+            if self._subscribers[entity_id] > 0:
+                continue
+
+            self._subscribers.pop(entity_id)
+            self._states.pop(entity_id, None)
+            self._listeners.pop(entity_id)()
+
+
+    #--------------------------------------------#
+    #       Event Handlers
+    #--------------------------------------------#
+
+    @callback
+    def _async_on_state_changed(self, event: Event) -> None:
+        """ Triggered when the state of a mirrored light changes. """
+        self._states[event.data.get(CONF_ENTITY_ID)] = event.data.get(CONF_NEW_STATE)
+
+
+#-----------------------------------------------------------#
+#       Helpers
+#-----------------------------------------------------------#
+
+def _within(actual: Any, expected: Any, tolerance: float) -> bool:
+    """ Determines whether a numeric attribute is within the tolerance of the expected value. """
+    try:
+        return abs(float(actual) - float(expected)) <= tolerance
+    except (TypeError, ValueError):
+        return False
@@ -0,0 +1,273 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from .target import TargetResolver
+from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_COLOR_TEMP, ATTR_HS_COLOR, ATTR_RGB_COLOR, ATTR_RGBW_COLOR, ATTR_RGBWW_COLOR, ATTR_XY_COLOR
+from homeassistant.const import ATTR_DOMAIN, ATTR_SERVICE_DATA, CONF_ENTITY_ID, EVENT_CALL_SERVICE, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import Context, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from typing import Any, Callable, Dict, Iterable, List, Set, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+CONF_NEW_STATE = "new_state"
+CONF_OLD_STATE = "old_state"
+CONTROL_ATTRIBUTES = [ATTR_BRIGHTNESS, ATTR_COLOR_TEMP, ATTR_HS_COLOR, ATTR_RGB_COLOR, ATTR_RGBW_COLOR, ATTR_RGBWW_COLOR, ATTR_XY_COLOR]
+GRACE_TIME = 2
+
+
+#-----------------------------------------------------------#
+#       Subscription
+#-----------------------------------------------------------#
+
+class ManualControlSubscription:
+    """ Holds the lights, action and context validator of a single subscriber. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, action: Callable[[List[str], Context], None], context_validator: Callable[[Context], bool]):
+        self.action = action
+        self.context_validator = context_validator
+        self.entity_ids  : Set[str]          = set()
+        self.grace_until : Dict[str, float]  = {}
+
+
+#-----------------------------------------------------------#
+#       ManualControlDispatcher
+#-----------------------------------------------------------#
+
+class ManualControlDispatcher:
+    """ Detects manual control through a single call_service listener and dispatches it to the subscribers tracking the affected lights. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant, target_resolver: TargetResolver):
+        self._hass = hass
+        self._target_resolver = target_resolver
+        self._domains         : Dict[str, int]                              = {}
+        self._index           : Dict[str, Set[ManualControlSubscription]]   = {}
+        self._remove_listener : Callable                                    = None
+        self._subscriptions   : Dict[Any, ManualControlSubscription]        = {}
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    @callback
+    def async_expect(self, key: Any, entity_ids: Iterable[str]) -> None:
+        """ Tells the detector that the subscriber identified by key is changing the entities. """
+
+    @callback
+    def async_stop(self) -> None:
+        """ Removes all subscriptions and the call_service listener. """
+        for key in list(self._subscriptions.keys()):
+            self.async_untrack(key)
+
+    @callback
+    def async_track(self, key: Any, entity_ids: Iterable[str], action: Callable[[List[str], Context], None], context_validator: Callable[[Context], bool]) -> Callable[[], None]:
+        """ Tracks manual control of the entities for the subscriber identified by key. Returns a callable that removes the subscription. """
+        self.async_untrack(key)
+        self._subscriptions[key] = ManualControlSubscription(action, context_validator)
+        self.async_update(key, entity_ids)
+
+        if self._remove_listener is None:
+            self._remove_listener = self._listen()
+
+        return lambda: self.async_untrack(key)
+
+    @callback
+    def async_untrack(self, key: Any) -> None:
+        """ Removes the subscription identified by key. """
+        subscription = self._subscriptions.pop(key, None)
+
+        if subscription is None:
+            return
+
+        self._unindex(subscription, subscription.entity_ids)
+
+        if not self._subscriptions and self._remove_listener:
+            self._remove_listener()
+            self._remove_listener = None
+
+    @callback
+    def async_update(self, key: Any, entity_ids: Iterable[str]) -> None:
+        """ Replaces the tracked entities of the subscriber identified by key. """
+        subscription = self._subscriptions.get(key, None)
+
+        if subscription is None:
+            return
+
+        entity_ids = set(entity_ids)
+        self._unindex(subscription, subscription.entity_ids - entity_ids)
+        self._index_entities(subscription, entity_ids - subscription.entity_ids)
+        subscription.entity_ids = entity_ids
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _listen(self) -> Callable[[], None]:
+        """ Starts listening for manual control. Returns a callable that stops listening. """
+        return self._hass.bus.async_listen(EVENT_CALL_SERVICE, self._async_on_service_call)
+
+    def _index_entities(self, subscription: ManualControlSubscription, entity_ids: Iterable[str]) -> None:
+        """ Adds the entities of a subscription to the index. """
+        for entity_id in entity_ids:
+            self._index.setdefault(entity_id, set()).add(subscription)
+            domain = entity_id.split(".")[0]
+            self._domains[domain] = self._domains.get(domain, 0) + 1
+
+    def _unindex(self, subscription: ManualControlSubscription, entity_ids: Iterable[str]) -> None:
+        """ Removes the entities of a subscription from the index. """
+        for entity_id in entity_ids:
+            subscribers = self._index.get(entity_id, None)
+
+            if subscribers is None:
+                continue
+
+            subscribers.discard(subscription)
+            subscription.grace_until.pop(entity_id, None)
+
+            if not subscribers:
+                self._index.pop(entity_id)
+
+            domain = entity_id.split(".")[0]
+            self._domains[domain] -= 1
+
+            if self._domains[domain] == 0:
+                self._domains.pop(domain)
+
+
+    #--------------------------------------------#
+    #       Event Handlers
+    #--------------------------------------------#
+
+    async def _async_on_service_call(self, event: Event) -> None:
+        """ Triggered when a call_service event is fired. """
+        if not event.data.get(ATTR_DOMAIN, "") in self._domains:
+            return
+
+        service_data = event.data.get(ATTR_SERVICE_DATA, {})
+        resolved_target = await self._target_resolver.async_resolve(service_data)
+        matches: Dict[ManualControlSubscription, List[str]] = {}
+
+        for entity_id in resolved_target:
+            for subscription in self._index.get(entity_id, ()):
+                matches.setdefault(subscription, []).append(entity_id)
+
+        for subscription, matched_entity_ids in matches.items():
+            if subscription.context_validator(event.context):
+                continue
+
+            await subscription.action(matched_entity_ids, event.context)
+
+
+#-----------------------------------------------------------#
+#       ManualControlStateDetector
+#-----------------------------------------------------------#
+
+class ManualControlStateDetector(ManualControlDispatcher):
+    """ Detects manual control from the state changes of the tracked lights, classifying each change by its context. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant):
+        super().__init__(hass, None)
+        self._entity_listeners : Dict[str, Callable]  = {}
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    @callback
+    def async_expect(self, key: Any, entity_ids: Iterable[str]) -> None:
+        """ Tells the detector that the subscriber identified by key is changing the entities, ignoring their state changes for the grace period. """
+        subscription = self._subscriptions.get(key, None)
+
+        if subscription is None:
+            return
+
+        grace_until = self._hass.loop.time() + GRACE_TIME
+
+        for entity_id in entity_ids:
+            if entity_id in subscription.entity_ids:
+                subscription.grace_until[entity_id] = grace_until
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _listen(self) -> Callable[[], None]:
+        """ State changes are listened to per entity as the entities are indexed, so there is no global listener to start. """
+        return lambda: None
+
+    def _index_entities(self, subscription: ManualControlSubscription, entity_ids: Iterable[str]) -> None:
+        """ Adds the entities of a subscription to the index, listening to the state changes of entities that are not listened to yet. """
+        entity_ids = list(entity_ids)
+        super()._index_entities(subscription, entity_ids)
+
+        for entity_id in entity_ids:
+            if entity_id not in self._entity_listeners:
+                self._entity_listeners[entity_id] = async_track_state_change_event(self._hass, entity_id, self._async_on_state_changed)
+
+    def _unindex(self, subscription: ManualControlSubscription, entity_ids: Iterable[str]) -> None:
+        """ Removes the entities of a subscription from the index, no longer listening to entities without subscribers. """
+        entity_ids = list(entity_ids)
+        super()._unindex(subscription, entity_ids)
+
+        for entity_id in entity_ids:
+            if entity_id not in self._index and entity_id in self._entity_listeners:
+                self._entity_listeners.pop(entity_id)()
+
+
+    #--------------------------------------------#
+    #       Event Handlers
+    #--------------------------------------------#
+
+    async def _async_on_state_changed(self, event: Event) -> None:
+        """ Triggered when the state of a tracked light changes. """
+        if not _is_control_change(event.data.get(CONF_OLD_STATE), event.data.get(CONF_NEW_STATE)):
+            return
+
+        entity_id = event.data.get(CONF_ENTITY_ID)
+        context = event.context
+        now = self._hass.loop.time()
+
+        for subscription in list(self._index.get(entity_id, ())):
+            if subscription.context_validator(context):
+                subscription.grace_until[entity_id] = now + GRACE_TIME
+                continue
+
+            if subscription.grace_until.get(entity_id, 0) > now:
+                continue
+
+            await subscription.action([entity_id], context)
+
+
+#-----------------------------------------------------------#
+#       Helpers
+#-----------------------------------------------------------#
+
+def _is_control_change(old_state: Union[State, None], new_state: Union[State, None]) -> bool:
+    """ Determines whether a state change can be the result of controlling the light (on/off, brightness or color), as opposed to the light being added, removed, becoming unavailable or updating other attributes. """
+    if old_state is None or new_state is None:
+        return False
+
+    if old_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN) or new_state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+        return False
+
+    if old_state.state != new_state.state:
+        return True
+
+    return any(old_state.attributes.get(attribute) != new_state.attributes.get(attribute) for attribute in CONTROL_ATTRIBUTES)
@@ -2,8 +2,10 @@
 #       Imports
 #-----------------------------------------------------------#
 
-from datetime import datetime
-from typing import Any, Dict, List
+from __future__ import annotations
+from time import monotonic
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Tuple
 
 
 #-----------------------------------------------------------#
@@ -11,17 +13,22 @@ from typing import Any, Dict, List
 #-----------------------------------------------------------#
 
 class Profile:
-    """ A class that contains lighting properties. """
+    """ An immutable value that contains lighting properties. Profiles with the same id, status, lights and attributes are equal. """
+    __slots__ = ("_attributes", "_created_at", "_fingerprint", "_id", "_key", "_lights", "_status")
+
     #--------------------------------------------#
     #       Constructor
     #--------------------------------------------#
 
-    def __init__(self, id: str, status: str, lights: List[str], attributes: Dict[str, Any]):
-        self._id = id
-        self._status = status
-        self._lights = lights
-        self._attributes = attributes
-        self._time_of_creation = datetime.now()
+    def __init__(self, id: str, status: str, lights: Iterable[str], attributes: Dict[str, Any]):
+        key = (id, status, frozenset(lights), _freeze(attributes))
+        object.__setattr__(self, "_attributes", MappingProxyType(dict(attributes)))
+        object.__setattr__(self, "_created_at", monotonic())
+        object.__setattr__(self, "_fingerprint", hash(key))
+        object.__setattr__(self, "_id", id)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_lights", tuple(lights))
+        object.__setattr__(self, "_status", status)
 
 
     #--------------------------------------------#
@@ -29,18 +36,28 @@ class Profile:
     #--------------------------------------------#
 
     @property
-    def attributes(self) -> Dict[str, Any]:
+    def attributes(self) -> Mapping[str, Any]:
         """ Returns the attributes. """
         return self._attributes
 
+    @property
+    def created_at(self) -> float:
+        """ Returns the monotonic time of creation. """
+        return self._created_at
+
+    @property
+    def fingerprint(self) -> int:
+        """ Returns a hash over the id, status, lights and attributes. """
+        return self._fingerprint
+
     @property
     def id(self) -> str:
         """ Returns the id. """
         return self._id
 
     @property
-    def lights(self) -> List[str]:
-        """ Returns the list of lights """
+    def lights(self) -> Tuple[str, ...]:
+        """ Returns the lights. """
         return self._lights
 
     @property
@@ -48,7 +65,43 @@ class Profile:
         """ Returns the status. """
         return self._status
 
-    @property
-    def time_of_creation(self) -> datetime:
-        """ Returns the time of creation. """
-        return self._time_of_creation
\ No newline at end of file
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Profile) and self._fingerprint == other._fingerprint and self._key == other._key
+
+    def __hash__(self) -> int:
+        return self._fingerprint
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def as_dict(self) -> Dict[str, Any]:
+        """ Returns a dict representation of the profile. """
+        return { "id": self._id, "status": self._status, "lights": list(self._lights), "attributes": dict(self._attributes) }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> Profile:
+        """ Creates a profile from its dict representation. """
+        return Profile(data["id"], data["status"], data["lights"], data["attributes"])
+
+
+#-----------------------------------------------------------#
+#       Helpers
+#-----------------------------------------------------------#
+
+def _freeze(value: Any) -> Any:
+    """ Converts a (nested) attribute value into a hashable value. """
+    if isinstance(value, Mapping):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+
+    return value
@@ -0,0 +1,157 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from asyncio import TimerHandle
+from collections import OrderedDict
+from homeassistant.core import HomeAssistant, callback
+from typing import Any, Callable, Dict
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+CYCLE_LEASE_TIME = 30
+MAX_CONCURRENT_CYCLES = 10
+SETTLE_TIME = 0.05
+STAGGER_TIME = 0.02
+
+
+#-----------------------------------------------------------#
+#       ReloadCoordinator
+#-----------------------------------------------------------#
+
+class ReloadCoordinator:
+    """ Collapses bursts of automation changes into one reset wave, staggering the resets and bounding how many reset/request cycles run at once. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant, max_concurrent: int = MAX_CONCURRENT_CYCLES, settle_time: float = SETTLE_TIME, stagger_time: float = STAGGER_TIME):
+        self._hass = hass
+        self._active         : Dict[Any, TimerHandle]        = {}
+        self._max_concurrent : int                           = max_concurrent
+        self._next_start     : float                         = 0
+        self._pending        : Dict[Any, Callable[[], None]] = {}
+        self._queue          : OrderedDict                   = OrderedDict()
+        self._settle_handle  : TimerHandle                   = None
+        self._settle_time    : float                         = settle_time
+        self._stagger_time   : float                         = stagger_time
+        self._starting       : Dict[Any, TimerHandle]        = {}
+        self._waves          : int                           = 0
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def active(self) -> int:
+        """ Gets the number of cycles currently running. """
+        return len(self._active)
+
+    @property
+    def is_idle(self) -> bool:
+        """ Gets a boolean indicating whether no reset is pending, queued or running. """
+        return not self._pending and not self._queue and not self._active
+
+    @property
+    def queued(self) -> int:
+        """ Gets the number of resets waiting to be admitted. """
+        return len(self._pending) + len(self._queue)
+
+    @property
+    def waves(self) -> int:
+        """ Gets the number of reset waves started. """
+        return self._waves
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    @callback
+    def async_cancel(self, key: Any) -> None:
+        """ Removes the subscriber identified by key from the pending, queued and running resets. """
+        self._pending.pop(key, None)
+        self._queue.pop(key, None)
+        handle = self._starting.pop(key, None)
+
+        if handle:
+            handle.cancel()
+
+        self.async_release(key)
+
+    @callback
+    def async_release(self, key: Any) -> None:
+        """ Marks the started cycle of the subscriber identified by key as finished, admitting the next queued reset. """
+        if key in self._starting:
+            return
+
+        handle = self._active.pop(key, None)
+
+        if handle is None:
+            return
+
+        handle.cancel()
+        self._admit()
+
+    @callback
+    def async_schedule(self, key: Any, action: Callable[[], None]) -> None:
+        """ Schedules a reset of the subscriber identified by key, to be run once the burst of changes has settled. """
+        self._pending[key] = action
+
+        if self._settle_handle:
+            self._settle_handle.cancel()
+
+        self._settle_handle = self._hass.loop.call_later(self._settle_time, self._start_wave)
+
+    @callback
+    def async_stop(self) -> None:
+        """ Cancels all pending, queued and running resets. """
+        if self._settle_handle:
+            self._settle_handle.cancel()
+            self._settle_handle = None
+
+        for handle in [*self._active.values(), *self._starting.values()]:
+            handle.cancel()
+
+        self._active.clear()
+        self._starting.clear()
+        self._pending.clear()
+        self._queue.clear()
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _admit(self) -> None:
+        """ Starts queued resets while there are free slots, spacing their starts by the stagger time. """
+        while self._queue and len(self._active) < self._max_concurrent:
+            key, action = self._queue.popitem(last=False)
+            self._next_start = max(self._next_start + self._stagger_time, self._hass.loop.time())
+
+            if key in self._active:
+                self._active.pop(key).cancel()
+
+            if key in self._starting:
+                self._starting.pop(key).cancel()
+
+            self._active[key] = self._hass.loop.call_at(self._next_start + CYCLE_LEASE_TIME, self.async_release, key)
+            self._starting[key] = self._hass.loop.call_at(self._next_start, self._run, key, action)
+
+    def _run(self, key: Any, action: Callable[[], None]) -> None:
+        """ Runs an admitted reset at its staggered start time. """
+        self._starting.pop(key, None)
+        action()
+
+    def _start_wave(self) -> None:
+        """ Moves the settled resets to the admission queue. """
+        self._settle_handle = None
+        self._waves += 1
+
+        self._queue.update(self._pending)
+        self._pending.clear()
+        self._admit()
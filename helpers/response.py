@@ -0,0 +1,110 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from collections import deque
+from homeassistant.core import Context
+from time import monotonic
+from typing import Deque
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+RESPONSE_HISTORY = 10
+RESPONSE_TIMEOUT_FACTOR = 2.0
+RESPONSE_TIMEOUT_INITIAL = 0.2
+RESPONSE_TIMEOUT_MARGIN = 0.02
+RESPONSE_TIMEOUT_MIN = 0.1
+
+
+#-----------------------------------------------------------#
+#       ResponseWindow
+#-----------------------------------------------------------#
+
+class ResponseWindow:
+    """ Tracks the responses to an event by the context lineage of the service calls that follow it, learning how many responders there are and how fast they answer. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, max_timeout: float):
+        self._max_timeout = max_timeout
+        self._context    : Context       = None
+        self._counts     : Deque[int]    = deque(maxlen=RESPONSE_HISTORY)
+        self._is_active  : bool          = False
+        self._latencies  : Deque[float]  = deque(maxlen=RESPONSE_HISTORY)
+        self._responses  : int           = 0
+        self._started_at : float         = 0
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def expected_responses(self) -> int:
+        """ Gets the number of responders that have answered recent events. """
+        return max(self._counts, default=0)
+
+    @property
+    def is_complete(self) -> bool:
+        """ Gets a boolean indicating whether all known responders have answered the current event. """
+        return self._is_active and self.expected_responses > 0 and self._responses >= self.expected_responses
+
+    @property
+    def max_timeout(self) -> float:
+        """ Gets the upper bound of the timeout. """
+        return self._max_timeout
+
+    @max_timeout.setter
+    def max_timeout(self, value: float) -> None:
+        """ Sets the upper bound of the timeout. """
+        self._max_timeout = value
+
+    @property
+    def timeout(self) -> float:
+        """ Gets the time to wait for responses, learned from the observed response times. """
+        if not self._latencies:
+            return min(RESPONSE_TIMEOUT_INITIAL, self._max_timeout)
+
+        return min(max(max(self._latencies) * RESPONSE_TIMEOUT_FACTOR + RESPONSE_TIMEOUT_MARGIN, RESPONSE_TIMEOUT_MIN), self._max_timeout)
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def finish(self) -> None:
+        """ Finishes the current event, remembering the number of responses it got. """
+        if not self._is_active:
+            return
+
+        self._is_active = False
+        self._counts.append(self._responses)
+
+    def forget_responders(self) -> None:
+        """ Forgets the learned number of responders (e.g. when the automations have changed). """
+        self._counts.clear()
+
+    def respond(self, context: Context) -> bool:
+        """ Registers a service call, returning a boolean indicating whether it is a response to the current (or last) event. """
+        if self._context is None or context is None or context.parent_id != self._context.id:
+            return False
+
+        self._latencies.append(monotonic() - self._started_at)
+
+        if self._is_active:
+            self._responses += 1
+        elif self._counts:
+            self._counts[-1] += 1
+
+        return True
+
+    def start(self, context: Context) -> None:
+        """ Starts waiting for responses to an event fired with the context. """
+        self._context = context
+        self._is_active = True
+        self._responses = 0
+        self._started_at = monotonic()
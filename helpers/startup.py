@@ -0,0 +1,157 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from asyncio import TimerHandle
+from collections import OrderedDict
+from homeassistant.core import HassJob, HomeAssistant, callback
+from logging import Logger
+from random import uniform
+from typing import Any, Callable, Dict, List, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+DEFAULT_START_DELAY = 0.5
+SLOT_LEASE_TIME = 30
+
+
+#-----------------------------------------------------------#
+#       StartupScheduler
+#-----------------------------------------------------------#
+
+class StartupScheduler:
+    """ Starts the switches in waves of at most max_concurrent switches, each started after a random jitter, and measures how long the full warm-up takes. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant, logger: Logger, max_concurrent: int, jitter: float, start_delay: float = DEFAULT_START_DELAY):
+        self._hass = hass
+        self._logger = logger
+        self._handles        : List[TimerHandle]       = []
+        self._jitter         : float                   = jitter
+        self._max_concurrent : int                     = max_concurrent
+        self._queue          : OrderedDict             = OrderedDict()
+        self._started_at     : Union[float, None]      = None
+        self._start_delay    : float                   = start_delay
+        self._started        : int                     = 0
+        self._wave           : Dict[Any, TimerHandle]  = {}
+        self._waves          : int                     = 0
+        self._warm_up_time   : Union[float, None]      = None
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def diagnostics(self) -> Dict[str, Any]:
+        """ Gets a dict describing the state of the scheduler, for the diagnostics download. """
+        return {
+            "max_concurrent": self._max_concurrent,
+            "jitter": self._jitter,
+            "queued": len(self._queue),
+            "starting": len(self._wave),
+            "waves": self._waves,
+            "warm_up_time": round(self._warm_up_time, 3) if self._warm_up_time is not None else None
+        }
+
+    @property
+    def is_idle(self) -> bool:
+        """ Gets a boolean indicating whether no switch is waiting to start or starting. """
+        return not self._queue and not self._wave
+
+    @property
+    def warm_up_time(self) -> Union[float, None]:
+        """ Gets the time (in seconds) it took from the first scheduled switch until every switch had started, or None while warming up. """
+        return self._warm_up_time
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    @callback
+    def async_cancel(self, key: Any) -> None:
+        """ Removes the switch identified by key from the queued and starting switches. """
+        self._queue.pop(key, None)
+        self.async_release(key)
+
+    @callback
+    def async_release(self, key: Any) -> None:
+        """ Marks the switch identified by key as started, starting the next wave once the current wave has started. """
+        handle = self._wave.pop(key, None)
+
+        if handle is None:
+            return
+
+        handle.cancel()
+        self._started += 1
+
+        if not self._wave:
+            self._start_wave()
+
+    @callback
+    def async_schedule(self, key: Any, action: Callable[[], Any]) -> None:
+        """ Schedules the start of the switch identified by key. """
+        self._queue[key] = HassJob(action)
+
+        if self._started_at is None:
+            self._started_at = self._hass.loop.time()
+            self._started = 0
+            self._waves = 0
+            self._warm_up_time = None
+
+        if not self._wave and not self._handles:
+            self._handles.append(self._hass.loop.call_later(self._start_delay, self._start_wave))
+
+    @callback
+    def async_stop(self) -> None:
+        """ Cancels all queued and starting switches. """
+        while self._handles:
+            self._handles.pop().cancel()
+
+        for handle in self._wave.values():
+            handle.cancel()
+
+        self._queue.clear()
+        self._wave.clear()
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _run(self, key: Any, job: HassJob) -> None:
+        """ Starts a switch of the current wave, unless it has been cancelled in the meantime. """
+        if key in self._wave:
+            self._hass.async_run_hass_job(job)
+
+    def _start_wave(self) -> None:
+        """ Starts the next wave of queued switches, spreading their starts over the jitter. """
+        while self._handles:
+            self._handles.pop().cancel()
+
+        if not self._queue:
+            self._finish()
+            return
+
+        self._waves += 1
+
+        while self._queue and len(self._wave) < self._max_concurrent:
+            key, job = self._queue.popitem(last=False)
+            delay = uniform(0, self._jitter)
+            self._wave[key] = self._hass.loop.call_later(delay + SLOT_LEASE_TIME, self.async_release, key)
+            self._handles.append(self._hass.loop.call_later(delay, self._run, key, job))
+
+    def _finish(self) -> None:
+        """ Records the warm-up time once every scheduled switch has started. """
+        if self._started_at is None:
+            return
+
+        self._warm_up_time = self._hass.loop.time() - self._started_at
+        self._started_at = None
+        self._logger.info(f"Started {self._started} switches in {self._waves} waves, warm-up took {self._warm_up_time:.3f} seconds.")
@@ -0,0 +1,135 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from bisect import bisect_left
+from time import perf_counter
+from typing import Any, Dict, List
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+HISTOGRAM_BUCKETS = [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5]
+
+
+#-----------------------------------------------------------#
+#       Histogram
+#-----------------------------------------------------------#
+
+class Histogram:
+    """ A timing histogram with fixed buckets. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self):
+        self._buckets : List[int] = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        self._count   : int       = 0
+        self._max     : float     = 0
+        self._total   : float     = 0
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def count(self) -> int:
+        """ Gets the number of observations. """
+        return self._count
+
+    @property
+    def mean(self) -> float:
+        """ Gets the mean of the observations (in seconds). """
+        return self._total / self._count if self._count else 0
+
+    @property
+    def total(self) -> float:
+        """ Gets the sum of the observations (in seconds). """
+        return self._total
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def as_dict(self) -> Dict[str, Any]:
+        """ Gets a dict representation of the histogram (in milliseconds). """
+        buckets = { f"<={bound * 1000:g}ms": count for bound, count in zip(HISTOGRAM_BUCKETS, self._buckets) }
+        buckets[f">{HISTOGRAM_BUCKETS[-1] * 1000:g}ms"] = self._buckets[-1]
+        return { "count": self._count, "mean_ms": round(self.mean * 1000, 3), "max_ms": round(self._max * 1000, 3), "total_ms": round(self._total * 1000, 3), "buckets": buckets }
+
+    def observe(self, value: float) -> None:
+        """ Adds an observation (in seconds). """
+        self._buckets[bisect_left(HISTOGRAM_BUCKETS, value)] += 1
+        self._count += 1
+        self._max = max(self._max, value)
+        self._total += value
+
+
+#-----------------------------------------------------------#
+#       Statistics
+#-----------------------------------------------------------#
+
+class Statistics:
+    """ Collects performance counters and timing histograms. Does nothing (besides a boolean check) when disabled. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, enabled: bool = False):
+        self._counters   : Dict[str, int]        = {}
+        self._enabled    : bool                  = enabled
+        self._histograms : Dict[str, Histogram]  = {}
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def enabled(self) -> bool:
+        """ Gets a boolean indicating whether statistics are collected. """
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        """ Sets a boolean indicating whether statistics are collected. """
+        self._enabled = value
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def as_dict(self) -> Dict[str, Any]:
+        """ Gets a dict representation of the counters and histograms. """
+        return {
+            "enabled": self._enabled,
+            "counters": dict(self._counters),
+            "timings": { name: histogram.as_dict() for name, histogram in self._histograms.items() }
+        }
+
+    def clock(self) -> float:
+        """ Gets the current time to pass to observe, or 0 when disabled. """
+        return perf_counter() if self._enabled else 0
+
+    def counter(self, name: str) -> int:
+        """ Gets the value of a counter. """
+        return self._counters.get(name, 0)
+
+    def histogram(self, name: str) -> Histogram:
+        """ Gets a histogram. """
+        return self._histograms.setdefault(name, Histogram())
+
+    def increment(self, name: str, count: int = 1) -> None:
+        """ Increments a counter. """
+        if self._enabled:
+            self._counters[name] = self._counters.get(name, 0) + count
+
+    def observe(self, name: str, started: float) -> None:
+        """ Adds the time elapsed since started (as returned by clock) to a histogram. """
+        if self._enabled and started:
+            self.histogram(name).observe(perf_counter() - started)
@@ -0,0 +1,179 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from homeassistant.const import ATTR_AREA_ID, ATTR_DEVICE_ID, ATTR_ENTITY_ID
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.device_registry import EVENT_DEVICE_REGISTRY_UPDATED
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
+from typing import Any, Callable, Dict, List, Set, Tuple, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+ATTR_ACTION = "action"
+ATTR_OLD_ENTITY_ID = "old_entity_id"
+REGISTRY_ACTION_REMOVE = "remove"
+
+
+#-----------------------------------------------------------#
+#       TargetResolver
+#-----------------------------------------------------------#
+
+class TargetResolver:
+    """ Resolves service call targets using area and device indexes built from the entity and device registries. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._area_entities   : Dict[str, Set[str]]         = {}
+        self._device_entities : Dict[str, Set[str]]         = {}
+        self._device_registry : Any                         = None
+        self._disabled        : Set[str]                    = set()
+        self._entity_registry : Any                         = None
+        self._indexed         : Dict[str, Tuple[str, str]]  = {}
+        self._listeners       : List[Callable]              = []
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    async def async_resolve(self, target: Union[str, List[str], Dict[str, Any]]) -> List[str]:
+        """ Resolves the target argument of a service call and returns a list of entity ids. """
+        if isinstance(target, str):
+            return cv.ensure_list_csv(target)
+
+        if isinstance(target, list):
+            return target
+
+        if self._entity_registry is None:
+            await self._async_build_index()
+
+        result = { entity_id for entity_id in cv.ensure_list_csv(target.get(ATTR_ENTITY_ID, [])) if entity_id not in self._disabled }
+
+        for device_id in cv.ensure_list_csv(target.get(ATTR_DEVICE_ID, [])):
+            result |= self._device_entities.get(device_id, set())
+
+        for area_id in cv.ensure_list_csv(target.get(ATTR_AREA_ID, [])):
+            result |= self._area_entities.get(area_id, set())
+
+        return list(result)
+
+    async def async_resolve_many(self, targets: List[Union[str, List[str], Dict[str, Any]]]) -> List[List[str]]:
+        """ Resolves the target arguments of a batch of service calls in order, resolving identical targets once. """
+        resolved = {}
+        results = []
+
+        for target in targets:
+            key = repr(target)
+
+            if key not in resolved:
+                resolved[key] = await self.async_resolve(target)
+
+            results.append(resolved[key])
+
+        return results
+
+    @callback
+    def async_stop(self) -> None:
+        """ Removes the registry listeners and clears the indexes. """
+        while self._listeners:
+            self._listeners.pop()()
+
+        self._area_entities.clear()
+        self._device_entities.clear()
+        self._disabled.clear()
+        self._indexed.clear()
+        self._device_registry = None
+        self._entity_registry = None
+
+
+    #--------------------------------------------#
+    #       Index Methods
+    #--------------------------------------------#
+
+    async def _async_build_index(self) -> None:
+        """ Builds the indexes from the entity and device registries. """
+        device_registry = await self._hass.helpers.device_registry.async_get_registry()
+        entity_registry = await self._hass.helpers.entity_registry.async_get_registry()
+
+        if self._entity_registry is not None:
+            return
+
+        self._device_registry = device_registry
+        self._entity_registry = entity_registry
+
+        for entity_id in entity_registry.entities:
+            self._index_entity(entity_id)
+
+        self._listeners.append(self._hass.bus.async_listen(EVENT_DEVICE_REGISTRY_UPDATED, self._async_on_device_registry_updated))
+        self._listeners.append(self._hass.bus.async_listen(EVENT_ENTITY_REGISTRY_UPDATED, self._async_on_entity_registry_updated))
+
+    def _index_entity(self, entity_id: str) -> None:
+        """ Adds an entity to the indexes, using its current registry entry. """
+        entry = self._entity_registry.async_get(entity_id)
+
+        if entry is None:
+            return
+
+        if entry.disabled:
+            self._disabled.add(entity_id)
+            return
+
+        area_id = entry.area_id
+
+        if area_id is None and entry.device_id is not None:
+            device = self._device_registry.async_get(entry.device_id)
+            area_id = device.area_id if device else None
+
+        if entry.device_id is not None:
+            self._device_entities.setdefault(entry.device_id, set()).add(entity_id)
+
+        if area_id is not None:
+            self._area_entities.setdefault(area_id, set()).add(entity_id)
+
+        self._indexed[entity_id] = (entry.device_id, area_id)
+
+    def _unindex_entity(self, entity_id: str) -> None:
+        """ Removes an entity from the indexes. """
+        self._disabled.discard(entity_id)
+        device_id, area_id = self._indexed.pop(entity_id, (None, None))
+
+        for index, key in [(self._device_entities, device_id), (self._area_entities, area_id)]:
+            if key is None or key not in index:
+                continue
+
+            index[key].discard(entity_id)
+
+            if not index[key]:
+                index.pop(key)
+
+
+    #--------------------------------------------#
+    #       Event Handlers
+    #--------------------------------------------#
+
+    @callback
+    def _async_on_device_registry_updated(self, event: Event) -> None:
+        """ Triggered when a device has been created, updated or removed. """
+        for entity_id in list(self._device_entities.get(event.data.get(ATTR_DEVICE_ID), [])):
+            self._unindex_entity(entity_id)
+            self._index_entity(entity_id)
+
+    @callback
+    def _async_on_entity_registry_updated(self, event: Event) -> None:
+        """ Triggered when an entity has been created, updated or removed. """
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+        self._unindex_entity(entity_id)
+
+        if ATTR_OLD_ENTITY_ID in event.data:
+            self._unindex_entity(event.data[ATTR_OLD_ENTITY_ID])
+
+        if event.data.get(ATTR_ACTION) != REGISTRY_ACTION_REMOVE:
+            self._index_entity(entity_id)
@@ -0,0 +1,250 @@
+#-----------------------------------------------------------#
+#       Imports
+#-----------------------------------------------------------#
+
+from __future__ import annotations
+from asyncio import TimerHandle
+from heapq import heapify, heappop, heappush
+from homeassistant.core import HassJob, HomeAssistant, callback
+from itertools import count
+from typing import Any, Callable, Dict, List, Set, Union
+
+
+#-----------------------------------------------------------#
+#       Constants
+#-----------------------------------------------------------#
+
+COMPACT_THRESHOLD = 64
+
+
+#-----------------------------------------------------------#
+#       Timer
+#-----------------------------------------------------------#
+
+class Timer:
+    """ A timer scheduled in a TimerWheel. Calling the timer cancels it, like the callables returned by async_call_later. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, wheel: TimerWheel, name: str, deadline: float, job: HassJob):
+        self._wheel = wheel
+        self._deadline  : float    = deadline
+        self._is_active : bool     = True
+        self._job       : HassJob  = job
+        self._name      : str      = name
+        self._node      : list     = None
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def deadline(self) -> float:
+        """ Gets the event loop time at which the timer fires. """
+        return self._deadline
+
+    @property
+    def is_active(self) -> bool:
+        """ Gets a boolean indicating whether the timer has neither fired nor been cancelled. """
+        return self._is_active
+
+    @property
+    def name(self) -> str:
+        """ Gets the name of the timer. """
+        return self._name
+
+    @property
+    def remaining(self) -> float:
+        """ Gets the time (in seconds) until the timer fires. """
+        return max(self._deadline - self._wheel.time(), 0)
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    def __call__(self) -> None:
+        self.cancel()
+
+    def cancel(self) -> None:
+        """ Cancels the timer. """
+        self._wheel._cancel(self)
+
+    def reschedule(self, delay: float) -> None:
+        """ Moves the timer to fire delay seconds from now. Postponing a timer only updates its deadline. """
+        self._wheel._reschedule(self, delay)
+
+
+#-----------------------------------------------------------#
+#       TimerWheel
+#-----------------------------------------------------------#
+
+class TimerWheel:
+    """ Schedules the timers of all switches in one heap with lazy cancellation, keeping a single event loop timer armed for the earliest deadline. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, hass: HomeAssistant):
+        self._hass = hass
+        self._armed_at    : Union[float, None]  = None
+        self._counter                           = count()
+        self._fired       : Set[Timer]          = set()
+        self._handle      : TimerHandle         = None
+        self._heap        : List[list]          = []
+        self._live        : int                 = 0
+        self._loop_arms   : int                 = 0
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def diagnostics(self) -> Dict[str, Any]:
+        """ Gets a dict describing the state of the wheel, for the diagnostics download. """
+        return {
+            "timers": self._live,
+            "heap_size": len(self._heap),
+            "next_deadline_in": round(max(self._armed_at - self.time(), 0), 3) if self._armed_at is not None else None,
+            "loop_timers_armed": self._loop_arms
+        }
+
+
+    #--------------------------------------------#
+    #       Methods
+    #--------------------------------------------#
+
+    @callback
+    def async_call_later(self, delay: float, action: Callable[..., Any], name: str = None) -> Timer:
+        """ Schedules the action to be run after delay seconds. Returns the timer, which cancels itself when called. """
+        timer = Timer(self, name or getattr(action, "__name__", "timer"), self.time() + delay, HassJob(action))
+        self._live += 1
+        self._push(timer)
+        return timer
+
+    @callback
+    def async_stop(self) -> None:
+        """ Cancels all timers. """
+        for node in self._heap:
+            if node[2] is not None:
+                node[2]._is_active = False
+
+        for timer in self._fired:
+            timer._is_active = False
+
+        self._fired.clear()
+        self._heap.clear()
+        self._live = 0
+        self._disarm()
+
+    def time(self) -> float:
+        """ Gets the current event loop time. """
+        return self._hass.loop.time()
+
+
+    #--------------------------------------------#
+    #       Private Methods
+    #--------------------------------------------#
+
+    def _arm(self) -> None:
+        """ Arms the event loop timer for the earliest deadline, if it is not armed for it already. """
+        while self._heap and self._heap[0][2] is None:
+            heappop(self._heap)
+
+        if not self._heap:
+            return self._disarm()
+
+        deadline = self._heap[0][0]
+
+        if self._armed_at is not None and self._armed_at <= deadline:
+            return
+
+        self._disarm()
+        self._armed_at = deadline
+        self._handle = self._hass.loop.call_at(deadline, self._fire)
+        self._loop_arms += 1
+
+    def _cancel(self, timer: Timer) -> None:
+        """ Cancels a timer by detaching it from its heap node; the node is discarded when it reaches the top of the heap. """
+        if not timer._is_active:
+            return
+
+        timer._is_active = False
+        self._live -= 1
+
+        if timer._node is not None:
+            timer._node[2] = None
+
+        if len(self._heap) > COMPACT_THRESHOLD and len(self._heap) > self._live * 2:
+            self._heap = [node for node in self._heap if node[2] is not None]
+            heapify(self._heap)
+
+    def _disarm(self) -> None:
+        """ Cancels the event loop timer. """
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+
+        self._armed_at = None
+
+    def _fire(self) -> None:
+        """ Runs the actions of all timers whose deadline has passed, each in its own event loop callback. """
+        self._handle = None
+        self._armed_at = None
+        now = self.time()
+
+        while self._heap and self._heap[0][0] <= now:
+            timer = heappop(self._heap)[2]
+
+            if timer is None:
+                continue
+
+            if timer._deadline > now:
+                self._push(timer, arm=False)
+                continue
+
+            timer._node = None
+            self._fired.add(timer)
+            self._hass.loop.call_soon(self._run, timer)
+
+        self._arm()
+
+    def _push(self, timer: Timer, arm: bool = True) -> None:
+        """ Adds a heap node for the timer at its deadline. """
+        timer._node = [timer._deadline, next(self._counter), timer]
+        heappush(self._heap, timer._node)
+
+        if arm:
+            self._arm()
+
+    def _reschedule(self, timer: Timer, delay: float) -> None:
+        """ Moves a timer to a new deadline, picking up later deadlines lazily. """
+        if not timer._is_active:
+            return
+
+        deadline = self.time() + delay
+
+        if timer._node is None or deadline >= timer._node[0]:
+            timer._deadline = deadline
+            return
+
+        timer._node[2] = None
+        timer._deadline = deadline
+        self._push(timer)
+
+    def _run(self, timer: Timer) -> None:
+        """ Runs the action of a fired timer, unless it has been cancelled or moved to a later deadline since it fired. """
+        self._fired.discard(timer)
+
+        if not timer._is_active:
+            return
+
+        if timer._deadline > self.time():
+            return self._push(timer)
+
+        timer._is_active = False
+        self._live -= 1
+        self._hass.async_run_hass_job(timer._job)
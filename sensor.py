@@ -0,0 +1,87 @@
+# -----------------------------------------------------------#
+#       Imports
+# -----------------------------------------------------------#
+
+from . import DOMAIN, DOMAIN_FRIENDLY_NAME, STATISTICS
+from .const import CONF_PERFORMANCE_METRICS, STAT_EVENTS_HANDLED, STAT_LIGHT_COMMANDS_SENT, STAT_LIGHT_COMMANDS_SUPPRESSED, STAT_LIGHT_MESSAGES_SAVED, TIMING_HANDLERS, TIMING_REQUEST_ROUND_TRIP
+from .helpers import Statistics
+from homeassistant.components.sensor import SensorEntity, STATE_CLASS_MEASUREMENT, STATE_CLASS_TOTAL_INCREASING
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_NAME, TIME_MILLISECONDS
+from homeassistant.core import HomeAssistant
+from typing import Callable, Union
+
+
+# -----------------------------------------------------------#
+#       Constants
+# -----------------------------------------------------------#
+
+SENSOR_HANDLER_TIME = "handler_time"
+SENSOR_REQUEST_ROUND_TRIP = "request_round_trip"
+
+SENSORS = {
+    STAT_EVENTS_HANDLED: ("Events handled", None, STATE_CLASS_TOTAL_INCREASING),
+    STAT_LIGHT_COMMANDS_SENT: ("Light commands sent", None, STATE_CLASS_TOTAL_INCREASING),
+    STAT_LIGHT_COMMANDS_SUPPRESSED: ("Light commands suppressed", None, STATE_CLASS_TOTAL_INCREASING),
+    STAT_LIGHT_MESSAGES_SAVED: ("Light messages saved", None, STATE_CLASS_TOTAL_INCREASING),
+    SENSOR_HANDLER_TIME: ("Time spent in handlers", TIME_MILLISECONDS, STATE_CLASS_TOTAL_INCREASING),
+    SENSOR_REQUEST_ROUND_TRIP: ("Request round trip", TIME_MILLISECONDS, STATE_CLASS_MEASUREMENT),
+}
+
+
+# -----------------------------------------------------------#
+#       Entry Setup
+# -----------------------------------------------------------#
+
+async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: Callable) -> bool:
+    if not config_entry.options.get(CONF_PERFORMANCE_METRICS, False):
+        return
+
+    statistics = hass.data[DOMAIN][config_entry.entry_id][STATISTICS]
+    async_add_entities([AL_StatisticsSensorEntity(config_entry, statistics, key) for key in SENSORS])
+
+
+# -----------------------------------------------------------#
+#       AL_StatisticsSensorEntity
+# -----------------------------------------------------------#
+
+class AL_StatisticsSensorEntity(SensorEntity):
+    """ Represents a performance statistic of a switch entity of the integration. """
+    #--------------------------------------------#
+    #       Constructor
+    #--------------------------------------------#
+
+    def __init__(self, config_entry: ConfigEntry, statistics: Statistics, key: str):
+        description, unit, state_class = SENSORS[key]
+
+        self._key        : str        = key
+        self._name       : str        = f"{DOMAIN_FRIENDLY_NAME} - {config_entry.data.get(CONF_NAME)} - {description}"
+        self._statistics : Statistics = statistics
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+
+
+    #--------------------------------------------#
+    #       Properties
+    #--------------------------------------------#
+
+    @property
+    def name(self) -> str:
+        """ Gets the name of entity. """
+        return self._name
+
+    @property
+    def native_value(self) -> Union[int, float]:
+        """ Gets the value of the statistic. """
+        if self._key == SENSOR_HANDLER_TIME:
+            return round(sum(self._statistics.histogram(name).total for name in TIMING_HANDLERS) * 1000, 3)
+
+        if self._key == SENSOR_REQUEST_ROUND_TRIP:
+            return round(self._statistics.histogram(TIMING_REQUEST_ROUND_TRIP).mean * 1000, 3)
+
+        return self._statistics.counter(self._key)
+
+    @property
+    def unique_id(self) -> str:
+        """ Gets the unique ID of entity. """
+        return self._name
@@ -3,21 +3,23 @@
 # -----------------------------------------------------------#
 
 from homeassistant.components.automation import EVENT_AUTOMATION_RELOADED
-from . import DOMAIN_FRIENDLY_NAME, LOGGER_BASE_NAME
-from .const import ATTR_BLOCKED_UNTIL, ATTR_STATUS, ATTR_UNTIL, CONF_BLOCK_DURATION, CONF_DURATION, CONF_LIGHT_GROUPS, CONF_STATUS, DEFAULT_BLOCK_DURATION, EVENT_DATA_TYPE_REQUEST, EVENT_DATA_TYPE_RESET, EVENT_TYPE_AUTOMATIC_LIGHTING, SERVICE_BLOCK, SERVICE_SCHEMA_BLOCK, SERVICE_SCHEMA_TRACK_LIGHTS, SERVICE_SCHEMA_TURN_OFF, SERVICE_SCHEMA_TURN_ON, SERVICE_TRACK_LIGHTS, STATUS_ACTIVE, STATUS_BLOCKED, STATUS_IDLE
-from .helpers import EntityBase, Profile, async_resolve_target, list_merge_unique, track_automations_changed, track_manual_control
+from . import AUTOMATION_TRACKER, COMMAND_SCHEDULER, DOMAIN, DOMAIN_FRIENDLY_NAME, ENTITY, LIGHT_GROUP_INDEX, LIGHT_STATE_MIRROR, LOGGER_BASE_NAME, MANUAL_CONTROL_DISPATCHER, MANUAL_CONTROL_STATE_DETECTOR, RELOAD_COORDINATOR, SHARED_DATA, STARTUP_SCHEDULER, STATISTICS, TARGET_RESOLVER, TIMER_WHEEL
+from .const import ATTR_BLOCKED_UNTIL, ATTR_STATUS, ATTR_UNTIL, CONF_BLOCK_DURATION, CONF_DURATION, CONF_LIGHT_GROUPS, CONF_MANUAL_CONTROL_MODE, CONF_PROFILES, CONF_RESPONSE_TIMEOUT, CONF_SPECULATIVE_REPLAY, CONF_STATUS, DEFAULT_BLOCK_DURATION, DEFAULT_MANUAL_CONTROL_MODE, DEFAULT_RESPONSE_TIMEOUT, EVENT_DATA_TYPE_REQUEST, EVENT_DATA_TYPE_RESET, EVENT_TYPE_AUTOMATIC_LIGHTING, MANUAL_CONTROL_MODE_STATE_CHANGE, PRIORITY_ACTIVE_TURN_OFF, PRIORITY_ACTIVE_TURN_ON, PRIORITY_IDLE_TURN_OFF, PRIORITY_IDLE_TURN_ON, SERVICE_APPLY_PROFILES, SERVICE_BLOCK, SERVICE_SCHEMA_APPLY_PROFILES, SERVICE_SCHEMA_BLOCK, SERVICE_SCHEMA_TRACK_LIGHTS, SERVICE_SCHEMA_TURN_OFF, SERVICE_SCHEMA_TURN_ON, SERVICE_TRACK_LIGHTS, STAT_BLOCKS, STAT_EVENTS_HANDLED, STAT_LIGHT_COMMANDS_SENT, STAT_LIGHT_COMMANDS_SUPPRESSED, STAT_LIGHT_MESSAGES_SAVED, STAT_REQUESTS, STAT_RESETS, STATUS_ACTIVE, STATUS_BLOCKED, STATUS_IDLE, TIMING_BLOCK, TIMING_MANUAL_CONTROL, TIMING_REQUEST, TIMING_REQUEST_ROUND_TRIP, TIMING_RESET, TIMING_TURN_OFF_UNUSED_ENTITIES
+from .helpers import AutomationTracker, CommandScheduler, EntityBase, LightGroupIndex, LightGroupTopology, LightStateMirror, ManualControlDispatcher, Profile, ReloadCoordinator, ResponseWindow, StartupScheduler, Statistics, TargetResolver, Timer, TimerWheel
+from asyncio import TimerHandle
 from datetime import datetime, timedelta
+from functools import partial
 from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_ID, CONF_DELAY, CONF_ENTITY_ID, CONF_ID, CONF_LIGHTS, CONF_NAME, EVENT_HOMEASSISTANT_START, SERVICE_TURN_OFF, SERVICE_TURN_ON, STATE_ON
-from homeassistant.core import Context, HomeAssistant
+from homeassistant.core import Context, HomeAssistant, ServiceCall, callback
 from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.entity_platform import EntityPlatform
-from homeassistant.helpers.event import async_call_later
-from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoredExtraData, RestoreEntity
 from logging import getLogger
-from typing import Any, Callable, Dict, List
+from time import monotonic
+from typing import Any, Callable, Dict, List, Set, Union
 
 
 # -----------------------------------------------------------#
@@ -25,9 +27,7 @@ from typing import Any, Callable, Dict, List
 # -----------------------------------------------------------#
 
 BLOCK_THROTTLE_TIME = 0.2
-REQUEST_DEBOUNCE_TIME = 0.2
-RESET_DEBOUNCE_TIME = 0.2
-START_DELAY = 0.5
+RESTORE_MAX_AGE = 600
 TURN_ON_THROTTLE_TIME = 0.2
 
 
@@ -36,7 +36,9 @@ TURN_ON_THROTTLE_TIME = 0.2
 # -----------------------------------------------------------#
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry, async_add_entities: Callable) -> bool:
-    async_add_entities([AL_SwitchEntity(config_entry)], update_before_add=True)
+    data = hass.data[DOMAIN][config_entry.entry_id]
+    data[ENTITY] = AL_SwitchEntity(config_entry, data[STATISTICS])
+    async_add_entities([data[ENTITY]], update_before_add=True)
     register_services(entity_platform.current_platform.get())
 
 
@@ -50,6 +52,34 @@ def register_services(platform: EntityPlatform) -> None:
     platform.async_register_entity_service(SERVICE_TURN_OFF, SERVICE_SCHEMA_TURN_OFF, "_async_service_turn_off")
     platform.async_register_entity_service(SERVICE_TURN_ON, SERVICE_SCHEMA_TURN_ON, "_async_service_turn_on")
 
+    if not platform.hass.services.has_service(DOMAIN, SERVICE_APPLY_PROFILES):
+        platform.hass.services.async_register(DOMAIN, SERVICE_APPLY_PROFILES, partial(async_service_apply_profiles, platform.hass), SERVICE_SCHEMA_APPLY_PROFILES)
+
+
+async def async_service_apply_profiles(hass: HomeAssistant, call: ServiceCall) -> None:
+    """ Handles a call to the 'automatic_lighting.apply_profiles' service, submitting the light commands of all profiles as one batch. """
+    data = hass.data[DOMAIN]
+    entities = { entry[ENTITY].entity_id: entry[ENTITY] for key, entry in data.items() if key not in SHARED_DATA and ENTITY in entry }
+    profiles = []
+
+    for profile in call.data[CONF_PROFILES]:
+        if profile[CONF_ENTITY_ID] not in entities:
+            getLogger(LOGGER_BASE_NAME).warning(f"Unable to apply profile {profile[CONF_ID]}: {profile[CONF_ENTITY_ID]} is not an {DOMAIN_FRIENDLY_NAME} switch.")
+            continue
+
+        profiles.append(dict(profile))
+
+    lights = await data[TARGET_RESOLVER].async_resolve_many([profile.pop(CONF_LIGHTS) for profile in profiles])
+    command_context = Context(parent_id=call.context.id)
+    data[COMMAND_SCHEDULER].async_pause()
+
+    try:
+        for profile, profile_lights in zip(profiles, lights):
+            entity = entities[profile.pop(CONF_ENTITY_ID)]
+            entity.async_apply_profile(call.context, profile.pop(CONF_ID), profile.pop(CONF_STATUS), profile_lights, profile, command_context)
+    finally:
+        data[COMMAND_SCHEDULER].async_resume()
+
 
 # -----------------------------------------------------------#
 #       AL_SwitchEntity
@@ -61,13 +91,18 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
     #       Constructor
     #--------------------------------------------#
 
-    def __init__(self, config_entry: ConfigEntry):
+    def __init__(self, config_entry: ConfigEntry, statistics: Statistics = None):
         EntityBase.__init__(self, getLogger(f"{LOGGER_BASE_NAME}.{cv.slugify(config_entry.unique_id)}"))
 
-        self._config_entry : ConfigEntry = config_entry
-        self._is_on        : bool        = None
-        self._listeners    : list        = []
-        self._name         : str         = f"{DOMAIN_FRIENDLY_NAME} - {config_entry.data.get(CONF_NAME)}"
+        self._command_context         : Context     = None
+        self._config_entry            : ConfigEntry = config_entry
+        self._is_on                   : bool        = None
+        self._listeners               : list        = []
+        self._manual_control_listener : Callable    = None
+        self._name                    : str         = f"{DOMAIN_FRIENDLY_NAME} - {config_entry.data.get(CONF_NAME)}"
+        self._restored_data           : dict        = None
+        self._state_write_handle      : TimerHandle = None
+        self._statistics              : Statistics  = statistics or Statistics()
 
         # --- Block ----------
         self._blocked_at            : datetime = None
@@ -76,8 +111,25 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
         self._block_duration        : int      = self._block_config_duration
 
         # --- Lights ----------
-        self._light_groups   : Dict[str, Any] = config_entry.options.get(CONF_LIGHT_GROUPS, {})
-        self._tracked_lights : List[str]      = list_merge_unique(*self._light_groups.values())
+        self._all_light_groups    : LightGroupTopology = LightGroupTopology(config_entry.options.get(CONF_LIGHT_GROUPS, {}))
+        self._light_groups        : LightGroupTopology = LightGroupTopology(config_entry.options.get(CONF_LIGHT_GROUPS, {}))
+        self._manual_control_mode : str                = config_entry.options.get(CONF_MANUAL_CONTROL_MODE, DEFAULT_MANUAL_CONTROL_MODE)
+        self._requested_lights    : Set[str]           = set()
+        self._suppressed_commands : int                = 0
+        self._tracked_lights      : List[str]          = list(self._light_groups.members)
+
+        # --- Profiles ----------
+        self._last_status         : str                = None
+        self._profile_cache       : Dict[str, Profile] = {}
+        self._replayed_profile    : Profile            = None
+        self._speculative_replay  : bool               = config_entry.options.get(CONF_SPECULATIVE_REPLAY, False)
+
+        # --- Requests ----------
+        self._request_started : float = 0
+
+        # --- Responses ----------
+        self._request_window : ResponseWindow = ResponseWindow(config_entry.options.get(CONF_RESPONSE_TIMEOUT, DEFAULT_RESPONSE_TIMEOUT))
+        self._reset_window   : ResponseWindow = ResponseWindow(config_entry.options.get(CONF_RESPONSE_TIMEOUT, DEFAULT_RESPONSE_TIMEOUT))
 
         # --- Status ----------
         self._current_profile       : Profile  = None
@@ -85,10 +137,10 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
         self._current_turn_off_time : datetime = None
 
         # --- Timers ----------
-        self._block_timer    : Callable = None
-        self._request_timer  : Callable = None
-        self._reset_timer    : Callable = None
-        self._turn_off_timer : Callable = None
+        self._block_timer    : Timer = None
+        self._request_timer  : Timer = None
+        self._reset_timer    : Timer = None
+        self._turn_off_timer : Timer = None
 
 
     #-----------------------------------------------------------------------------#
@@ -118,6 +170,23 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
 
         return attributes
 
+    @property
+    def extra_restore_state_data(self) -> ExtraStoredData:
+        """ Gets the block, profile and tracked lights state to restore after a restart (none while a reset or request cycle is running). """
+        if self._reset_timer or self._request_timer:
+            return None
+
+        return RestoredExtraData({
+            "saved_at": datetime.now().isoformat(),
+            "status": self._current_status,
+            "blocked_until": self._blocked_until.isoformat() if self.is_blocked and self._blocked_until else None,
+            "block_duration": self._block_duration,
+            "profile": self._current_profile.as_dict() if self._current_profile else None,
+            "turn_off_time": self._current_turn_off_time.isoformat() if self._turn_off_timer else None,
+            "tracked_lights": list(self._tracked_lights),
+            "requested_lights": list(self._requested_lights)
+        })
+
     @property
     def is_on(self) -> bool:
         """ Gets a boolean indicating whether the entity is turned on. """
@@ -131,7 +200,7 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
     @property
     def should_poll(self) -> bool:
         """ Gets a boolean indicating whether Home Assistant should automatically poll the entity. """
-        return True
+        return False
 
     @property
     def unique_id(self) -> str:
@@ -146,11 +215,14 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
     async def async_added_to_hass(self) -> None:
         """ Triggered when the entity has been added to Home Assistant. """
         async def async_initialize(*args: Any):
-            self._listeners.append(async_call_later(self.hass, START_DELAY, self.async_turn_on))
+            self.startup_scheduler.async_schedule(self.unique_id, self.async_turn_on)
 
         last_state = await self.async_get_last_state()
+        last_extra_data = await self.async_get_last_extra_data()
 
         if not last_state or last_state.state == STATE_ON:
+            self._restored_data = last_extra_data.as_dict() if last_extra_data else None
+
             if self.hass.is_running:
                 return await async_initialize()
             else:
@@ -160,8 +232,13 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
 
     async def async_will_remove_from_hass(self) -> None:
         """ Triggered when the entity is being removed from Home Assistant. """
+        self._cancel_cycle()
         self._remove_listeners()
 
+        if self._state_write_handle:
+            self._state_write_handle.cancel()
+            self._state_write_handle = None
+
 
     #--------------------------------------------#
     #       Methods
@@ -173,15 +250,76 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
             return
 
         self._is_on = False
+        self._cancel_cycle()
         self._remove_listeners()
+        self._schedule_state_write()
 
     async def async_turn_on(self, *args: Any) -> None:
         """ Turns on the entity. """
         if self._is_on:
-            return
+            return self.startup_scheduler.async_release(self.unique_id)
 
         self._is_on = True
-        self._reset()
+
+        if not self._resume():
+            self._reset()
+
+        if not self._reset_timer and not self._request_timer:
+            self._release_cycle()
+
+        self._schedule_state_write()
+
+    @callback
+    def async_update_options(self, options: Dict[str, Any]) -> None:
+        """ Applies changed options to the running entity, keeping its block state and profile. """
+        self._block_config_duration = options.get(CONF_BLOCK_DURATION, DEFAULT_BLOCK_DURATION)
+        self._request_window.max_timeout = options.get(CONF_RESPONSE_TIMEOUT, DEFAULT_RESPONSE_TIMEOUT)
+        self._reset_window.max_timeout = options.get(CONF_RESPONSE_TIMEOUT, DEFAULT_RESPONSE_TIMEOUT)
+        self._speculative_replay = options.get(CONF_SPECULATIVE_REPLAY, False)
+
+        if not self.is_blocked:
+            self._block_duration = self._block_config_duration
+
+        manual_control_mode = options.get(CONF_MANUAL_CONTROL_MODE, DEFAULT_MANUAL_CONTROL_MODE)
+
+        if manual_control_mode != self._manual_control_mode:
+            is_listening = self._manual_control_listener in self._listeners
+
+            if is_listening:
+                self._listeners.remove(self._manual_control_listener)
+                self._manual_control_listener()
+
+            self._manual_control_mode = manual_control_mode
+            self.logger.debug(f"Detecting manual control using the {manual_control_mode} mode.")
+
+            if is_listening:
+                self._track_manual_control()
+
+        old_members = self._light_groups.members
+
+        if self._light_groups.update(options.get(CONF_LIGHT_GROUPS, {})):
+            new_members = self._light_groups.members
+            removed_lights = old_members - new_members - self._requested_lights
+            self._tracked_lights = [light for light in self._tracked_lights if light not in removed_lights]
+            self._tracked_lights.extend(sorted(new_members - set(self._tracked_lights)))
+            self.logger.debug(f"Light groups changed, tracking {len(self._tracked_lights)} lights for manual control.")
+            self._update_all_light_groups()
+            self._update_listeners()
+
+
+    #--------------------------------------------#
+    #       State Methods
+    #--------------------------------------------#
+
+    def _schedule_state_write(self) -> None:
+        """ Schedules a state write at the end of the current event loop iteration, coalescing all changes made until then into one write. """
+        if self._state_write_handle is None:
+            self._state_write_handle = self.hass.loop.call_soon(self._write_state)
+
+    def _write_state(self) -> None:
+        """ Writes the state to Home Assistant. """
+        self._state_write_handle = None
+        self.async_write_ha_state()
 
 
     #-----------------------------------------------------------------------------#
@@ -192,11 +330,89 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
     #       Properties
     #--------------------------------------------#
 
+    @property
+    def automation_tracker(self) -> AutomationTracker:
+        """ Gets the automation tracker shared by all entities of the integration. """
+        return self.hass.data[DOMAIN][AUTOMATION_TRACKER]
+
+    @property
+    def command_scheduler(self) -> CommandScheduler:
+        """ Gets the light command scheduler shared by all entities of the integration. """
+        return self.hass.data[DOMAIN][COMMAND_SCHEDULER]
+
+    @property
+    def diagnostics(self) -> Dict[str, Any]:
+        """ Gets a dict describing the internal state of the entity, for the diagnostics download. """
+        return {
+            "entity_id": self.entity_id,
+            "is_on": self._is_on,
+            "status": self._current_status,
+            "blocked_until": self._blocked_until.isoformat() if self.is_blocked and self._blocked_until else None,
+            "profile": self._current_profile.id if self._current_profile else None,
+            "profile_cache": { status: profile.id for status, profile in self._profile_cache.items() },
+            "tracked_lights": len(self._tracked_lights),
+            "light_groups": len(self._light_groups.groups),
+            "all_light_groups": len(self._all_light_groups.groups),
+            "request_window": { "timeout": self._request_window.timeout, "expected_responses": self._request_window.expected_responses },
+            "reset_window": { "timeout": self._reset_window.timeout, "expected_responses": self._reset_window.expected_responses },
+            "suppressed_commands": self._suppressed_commands,
+            "template_cache": { "hits": self.template_cache_hits, "misses": self.template_cache_misses },
+            "timers": { timer.name: round(timer.remaining, 3) for timer in (self._block_timer, self._request_timer, self._reset_timer, self._turn_off_timer) if timer }
+        }
+
     @property
     def is_blocked(self) -> bool:
         """ Gets a boolean indicating whether the entity is blocked. """
         return self._block_timer is not None
 
+    @property
+    def light_group_index(self) -> LightGroupIndex:
+        """ Gets the light group index shared by all entities of the integration. """
+        return self.hass.data[DOMAIN][LIGHT_GROUP_INDEX]
+
+    @property
+    def light_state_mirror(self) -> LightStateMirror:
+        """ Gets the light state mirror shared by all entities of the integration. """
+        return self.hass.data[DOMAIN][LIGHT_STATE_MIRROR]
+
+    @property
+    def manual_control_dispatcher(self) -> ManualControlDispatcher:
+        """ Gets the manual control detector of the configured mode, shared by all entities of the integration. """
+        if self._manual_control_mode == MANUAL_CONTROL_MODE_STATE_CHANGE:
+            return self.hass.data[DOMAIN][MANUAL_CONTROL_STATE_DETECTOR]
+
+        return self.hass.data[DOMAIN][MANUAL_CONTROL_DISPATCHER]
+
+    @property
+    def reload_coordinator(self) -> ReloadCoordinator:
+        """ Gets the reload coordinator shared by all entities of the integration. """
+        return self.hass.data[DOMAIN][RELOAD_COORDINATOR]
+
+    @property
+    def startup_scheduler(self) -> StartupScheduler:
+        """ Gets the startup scheduler shared by all entities of the integration. """
+        return self.hass.data[DOMAIN][STARTUP_SCHEDULER]
+
+    @property
+    def statistics(self) -> Statistics:
+        """ Gets the performance statistics of the entity. """
+        return self._statistics
+
+    @property
+    def suppressed_commands(self) -> int:
+        """ Gets the number of light commands that were skipped because the lights already were in the requested state. """
+        return self._suppressed_commands
+
+    @property
+    def target_resolver(self) -> TargetResolver:
+        """ Gets the target resolver shared by all entities of the integration. """
+        return self.hass.data[DOMAIN][TARGET_RESOLVER]
+
+    @property
+    def timer_wheel(self) -> TimerWheel:
+        """ Gets the timer wheel shared by all entities of the integration. """
+        return self.hass.data[DOMAIN][TIMER_WHEEL]
+
 
     #--------------------------------------------#
     #       Listeners Methods
@@ -214,8 +430,67 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
 
     def _setup_listeners(self, *args: Any) -> None:
         """ Sets up the event listeners. """
-        self._listeners.append(track_automations_changed(self.hass, self._async_on_automations_changed))
-        self._listeners.append(track_manual_control(self.hass, self._tracked_lights, self._async_on_manual_control, self.is_context_internal))
+        self._listeners.append(self.automation_tracker.async_track(self.unique_id, self._async_on_automations_changed))
+        self._track_manual_control()
+        self._listeners.append(self.light_state_mirror.async_track(self.unique_id, [*self._tracked_lights, *self._light_groups.groups]))
+        self._listeners.append(self.light_group_index.async_track(self.unique_id, self._on_light_groups_discovered))
+        self._update_all_light_groups()
+
+    def _track_manual_control(self) -> None:
+        """ Subscribes the tracked lights to the manual control dispatcher of the current mode. """
+        self._manual_control_listener = self.manual_control_dispatcher.async_track(self.unique_id, self._tracked_lights, self._async_on_manual_control, self.is_context_internal)
+        self._listeners.append(self._manual_control_listener)
+
+    def _update_all_light_groups(self) -> None:
+        """ Updates the light groups used for planning commands to the discovered light groups, overridden by the configured ones. """
+        self._all_light_groups.update({ **self.light_group_index.groups, **self._light_groups.as_dict() })
+
+    def _update_listeners(self) -> None:
+        """ Updates the lights watched by the event listeners to the tracked lights. """
+        self.manual_control_dispatcher.async_update(self.unique_id, self._tracked_lights)
+        self.light_state_mirror.async_update(self.unique_id, [*self._tracked_lights, *self._light_groups.groups])
+
+
+    #--------------------------------------------#
+    #       Restore Methods
+    #--------------------------------------------#
+
+    def _resume(self) -> bool:
+        """ Resumes the block, profile and tracked lights saved before a restart, and returns a boolean indicating whether the state was resumed. """
+        data, self._restored_data = self._restored_data, None
+        saved_at = _parse_datetime(data.get("saved_at", None)) if data else None
+
+        if saved_at is None or (datetime.now() - saved_at).total_seconds() > RESTORE_MAX_AGE:
+            return False
+
+        blocked_until = _parse_datetime(data.get("blocked_until", None))
+        turn_off_time = _parse_datetime(data.get("turn_off_time", None))
+
+        if turn_off_time and turn_off_time <= datetime.now():
+            return False
+
+        self.logger.debug(f"Resuming the state saved at {data.get('saved_at')}.")
+        self._requested_lights = set(data.get("requested_lights", []))
+        self._tracked_lights = list(data.get("tracked_lights", []))
+        self._tracked_lights.extend(sorted(self._light_groups.members - set(self._tracked_lights)))
+        self._setup_listeners()
+
+        if data.get("profile", None):
+            self._current_profile = Profile.from_dict(data["profile"])
+            self._cache_profile(self._current_profile)
+
+        self._current_status = data.get("status", STATUS_IDLE)
+
+        if blocked_until and blocked_until > datetime.now():
+            self._block((blocked_until - datetime.now()).total_seconds())
+            self._block_duration = data.get("block_duration", self._block_config_duration)
+        elif turn_off_time and self._current_profile:
+            self._current_turn_off_time = turn_off_time
+            self._turn_off_timer = self.timer_wheel.async_call_later((turn_off_time - datetime.now()).total_seconds(), self._on_turn_off_timer)
+        elif self._current_status != STATUS_IDLE:
+            self._request()
+
+        return True
 
 
     #--------------------------------------------#
@@ -246,60 +521,89 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
             self._turn_off_timer()
             self._turn_off_timer = None
 
+    def _schedule_timer(self, timer: Timer, delay: float, action: Callable) -> Timer:
+        """ Schedules the action in the shared timer wheel, moving the timer if it is already running. """
+        if timer and timer.is_active:
+            timer.reschedule(delay)
+            return timer
+
+        return self.timer_wheel.async_call_later(delay, action)
+
 
     #--------------------------------------------#
     #       Event Methods
     #--------------------------------------------#
 
+    @callback
     def _request(self, *args: Any) -> None:
         """ Fires the request event, requesting the next lighting settings. """
-        if self._request_timer:
-            self._reset_request_timer()
-        else:
+        started = self._statistics.clock()
+
+        if not self._request_timer:
             self.logger.debug(f"Firing request event.")
+            self._statistics.increment(STAT_REQUESTS)
+            self._request_started = started
             self._current_profile = None
             self._reset_turn_off_timer()
-            self.fire_event(EVENT_TYPE_AUTOMATIC_LIGHTING, entity_id=self.entity_id, type=EVENT_DATA_TYPE_REQUEST)
+            self._request_window.start(self.fire_event(EVENT_TYPE_AUTOMATIC_LIGHTING, entity_id=self.entity_id, type=EVENT_DATA_TYPE_REQUEST))
 
-        def _on_request_finished(*args: Any) -> None:
-            """ Triggered when the request event has finished. """
-            self._reset_request_timer()
+        self._request_timer = self._schedule_timer(self._request_timer, self._request_window.timeout, self._on_request_finished)
+        self._statistics.observe(TIMING_REQUEST, started)
 
-            if self.is_blocked:
-                return
+    @callback
+    def _on_request_finished(self, *args: Any) -> None:
+        """ Triggered when all responders have answered the request event, or when the response timeout has elapsed. """
+        self._reset_request_timer()
+        self._request_window.finish()
+        self._statistics.observe(TIMING_REQUEST_ROUND_TRIP, self._request_started)
+        self._release_cycle()
 
-            if self._current_profile:
-                self.logger.debug(f"Turning on profile {self._current_profile.id} with the following values: { {CONF_ENTITY_ID: self._current_profile.lights, **self._current_profile.attributes} }")
-                self._current_status = self._current_profile.status
-                self._turn_off_unused_entities(self._tracked_lights, self._current_profile.lights)
-                self.call_service(LIGHT_DOMAIN, SERVICE_TURN_ON, entity_id=self._current_profile.lights, **self._current_profile.attributes)
-            else:
-                self.logger.debug(f"No profile was provided.")
-                self._current_status = STATUS_IDLE
-                self._turn_off_unused_entities(self._tracked_lights, [])
+        if self.is_blocked:
+            return
 
-            self.async_schedule_update_ha_state(True)
+        replayed_profile = self._replayed_profile
+        self._replayed_profile = None
+        old_entity_ids = [*self._tracked_lights, *replayed_profile.lights] if replayed_profile else self._tracked_lights
+
+        if self._current_profile:
+            self.logger.debug(f"Turning on profile {self._current_profile.id} with the following values: { {CONF_ENTITY_ID: self._current_profile.lights, **self._current_profile.attributes} }")
+            self._current_status = self._current_profile.status
+            self._cache_profile(self._current_profile)
+            self._turn_off_unused_entities(old_entity_ids, self._current_profile.lights)
+            self._turn_on_lights(self._unreplayed_lights(replayed_profile, self._current_profile), self._current_profile.attributes)
+        else:
+            self.logger.debug(f"No profile was provided.")
+            self._current_status = STATUS_IDLE
+            self._turn_off_unused_entities(old_entity_ids, [])
 
-        self._request_timer = async_call_later(self.hass, REQUEST_DEBOUNCE_TIME, _on_request_finished)
+        self._schedule_state_write()
 
+    @callback
     def _reset(self, *args: Any) -> None:
         """ Fires the reset event. """
-        if self._reset_timer:
-            self._reset_reset_timer()
-        else:
+        started = self._statistics.clock()
+
+        if not self._reset_timer:
             self.logger.debug(f"Firing reset event.")
-            self._tracked_lights = list_merge_unique(*self._light_groups.values())
+            self._statistics.increment(STAT_RESETS)
+            self._replayed_profile = None
+            self._requested_lights.clear()
+            self._tracked_lights = list(self._light_groups.members)
             self._remove_listeners()
-            self.fire_event(EVENT_TYPE_AUTOMATIC_LIGHTING, entity_id=self.entity_id, type=EVENT_DATA_TYPE_RESET)
+            self._reset_window.start(self.fire_event(EVENT_TYPE_AUTOMATIC_LIGHTING, entity_id=self.entity_id, type=EVENT_DATA_TYPE_RESET))
 
-        def _on_reset_finished(*args: Any) -> None:
-            """ Triggered when the reset event has finished. """
-            self.logger.debug(f"Tracking {len(self._tracked_lights)} lights for manual control.")
-            self._reset_reset_timer()
-            self._setup_listeners()
-            self._request()
+        self._reset_timer = self._schedule_timer(self._reset_timer, self._reset_window.timeout, self._on_reset_finished)
+        self._statistics.observe(TIMING_RESET, started)
 
-        self._reset_timer = async_call_later(self.hass, RESET_DEBOUNCE_TIME, _on_reset_finished)
+    @callback
+    def _on_reset_finished(self, *args: Any) -> None:
+        """ Triggered when all responders have answered the reset event, or when the response timeout has elapsed. """
+        self.logger.debug(f"Tracking {len(self._tracked_lights)} lights for manual control.")
+        self._reset_reset_timer()
+        self._reset_window.finish()
+        self._setup_listeners()
+        self._request()
+        self._replay_profile(self._last_status)
 
 
     #--------------------------------------------#
@@ -311,60 +615,140 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
         if self.is_blocked and (datetime.now() - self._blocked_at).total_seconds() < BLOCK_THROTTLE_TIME and duration == self._block_duration:
             return
 
+        started = self._statistics.clock()
         self.logger.debug(f"Blocking entity for {duration} seconds.")
-        self._reset_block_timer()
+        self._statistics.increment(STAT_BLOCKS)
         self._reset_request_timer()
         self._reset_turn_off_timer()
+        self._release_cycle()
+        self.command_scheduler.async_discard(set(self._tracked_lights).union(*(self._all_light_groups.groups_of(light) for light in self._tracked_lights)))
+        self._replayed_profile = None
         self._block_duration = duration
         self._blocked_at = datetime.now()
         self._blocked_until = self._blocked_at + timedelta(seconds=self._block_duration) if self._block_duration is not None else None
-        self._block_timer = async_call_later(self.hass, self._block_duration, self._unblock)
+        self._block_timer = self._schedule_timer(self._block_timer, self._block_duration, self._unblock)
         self._current_status = STATUS_BLOCKED
-        self.async_schedule_update_ha_state(True)
+        self._schedule_state_write()
+        self._statistics.observe(TIMING_BLOCK, started)
 
+    @callback
     def _unblock(self, *args: Any) -> None:
         """ Unblocks the entity. """
         self.logger.debug(f"Unblocking entity for after {self._block_duration} seconds of inactivity.")
         self._reset_block_timer()
         self._request()
+        self._replay_profile(self._last_status)
+
+    @callback
+    def _on_turn_off_timer(self, *args: Any) -> None:
+        """ Triggered when the delay of the 'automatic_lighting.turn_off' service has elapsed. """
+        self._request()
+        self._replay_profile(STATUS_IDLE)
 
 
     #--------------------------------------------#
     #       Helper Methods
     #--------------------------------------------#
 
-    def _turn_off_unused_entities(self, old_entity_ids: List[str], new_entity_ids: List[str]) -> None:
-        """ Turns off entities if they are not used in the current profile. """
-        blacklist = []
-        unused_entities = []
+    def _cache_profile(self, profile: Profile) -> None:
+        """ Remembers the profile as the last applied profile of its status, for speculative replay. """
+        self._last_status = profile.status
+        self._profile_cache[profile.status] = profile
+
+    def _cancel_cycle(self) -> None:
+        """ Cancels the pending or running cycle in the shared reload coordinator and startup scheduler. """
+        self.reload_coordinator.async_cancel(self.unique_id)
+        self.startup_scheduler.async_cancel(self.unique_id)
+
+    def _count_commands(self, sent: int, suppressed: int) -> None:
+        """ Counts the sent and suppressed light commands. """
+        self._suppressed_commands += suppressed
+        self._statistics.increment(STAT_LIGHT_COMMANDS_SENT, sent)
+        self._statistics.increment(STAT_LIGHT_COMMANDS_SUPPRESSED, suppressed)
 
-        for i in old_entity_ids:
-            if i in self._light_groups:
-                blacklist = blacklist + self._light_groups[i]
-                unused_entities.append(i)
-                continue
+    def _register_response(self, window: ResponseWindow, context: Context) -> bool:
+        """ Registers a service call as a possible response to an event, remembering which automation made it. """
+        if not window.respond(context):
+            return False
 
-        for i in old_entity_ids:
-            if i in self._light_groups:
-                continue
+        self.automation_tracker.async_add_responder(self.unique_id, context)
+        return True
+
+    def _release_cycle(self) -> None:
+        """ Releases the slot the running cycle holds in the shared reload coordinator and startup scheduler. """
+        self.reload_coordinator.async_release(self.unique_id)
+        self.startup_scheduler.async_release(self.unique_id)
 
-            if not i in blacklist:
-                unused_entities.append(i)
+    def _replay_profile(self, status: str) -> None:
+        """ Speculatively turns on the last applied profile of the status while the request event is answered. """
+        profile = self._profile_cache.get(status, None) if self._speculative_replay else None
 
-        for i in new_entity_ids:
-            for x in unused_entities:
-                if x in self._light_groups and i in self._light_groups[x]:
-                    unused_entities.remove(x)
-                    unused_entities = unused_entities + [t for t in self._light_groups[x] if t not in new_entity_ids]
+        if profile is None or self.is_blocked or not self._request_timer:
+            return
 
-                if x == i:
-                    unused_entities.remove(x)
+        self.logger.debug(f"Replaying profile {profile.id} while waiting for the request event to be answered.")
+        self._replayed_profile = profile
+        self._turn_on_lights(profile.lights, profile.attributes)
 
-        unused_entities = [entity for entity in unused_entities if self.hass.states.get(entity).state == STATE_ON]
+    def _unreplayed_lights(self, replayed_profile: Profile, profile: Profile) -> List[str]:
+        """ Gets the lights of the profile that were not already turned on with the same attributes by the replayed profile. """
+        if replayed_profile is None or replayed_profile.attributes != profile.attributes:
+            return profile.lights
+
+        lights = [light for light in profile.lights if light not in replayed_profile.lights]
+        self._count_commands(0, len(profile.lights) - len(lights))
+        return lights
+
+    def _turn_off_unused_entities(self, old_entity_ids: List[str], new_entity_ids: List[str]) -> None:
+        """ Turns off entities if they are not used in the current profile. """
+        started = self._statistics.clock()
+        unused_entities = self._all_light_groups.plan_turn_off(old_entity_ids, new_entity_ids)
 
         if len(unused_entities) > 0:
             self.logger.debug(f"Turning off unused entities: {unused_entities}")
-            self.call_service(LIGHT_DOMAIN, SERVICE_TURN_OFF, entity_id=unused_entities)
+            self._turn_off_lights(unused_entities)
+
+        self._statistics.observe(TIMING_TURN_OFF_UNUSED_ENTITIES, started)
+
+    def _is_command_pending(self, entity_id: str) -> bool:
+        """ Determines whether a light, or a light group it overlaps, has a pending command in the command scheduler. """
+        return any(self.command_scheduler.is_pending(light) for light in (entity_id, *self._light_groups.groups_of(entity_id), *self._light_groups.members_of(entity_id)))
+
+    def _turn_off_lights(self, entity_ids: List[str]) -> None:
+        """ Turns off the lights, skipping those that are already off and have no command pending. """
+        pending_entity_ids = [entity_id for entity_id in entity_ids if self._is_command_pending(entity_id) or self.light_state_mirror.is_on(entity_id)]
+        self._count_commands(len(pending_entity_ids), len(entity_ids) - len(pending_entity_ids))
+
+        if pending_entity_ids:
+            self._send_command(SERVICE_TURN_OFF, pending_entity_ids, {})
+
+    def _turn_on_lights(self, entity_ids: List[str], attributes: Dict[str, Any]) -> None:
+        """ Turns on the lights, skipping those that are already on with matching attributes and have no command pending. """
+        attributes = self._parse_service_data(attributes)
+        pending_entity_ids = [entity_id for entity_id in entity_ids if self._is_command_pending(entity_id) or not self.light_state_mirror.matches(entity_id, attributes)]
+        self._count_commands(len(pending_entity_ids), len(entity_ids) - len(pending_entity_ids))
+
+        if pending_entity_ids:
+            self._send_command(SERVICE_TURN_ON, pending_entity_ids, attributes)
+
+    def _send_command(self, service: str, entity_ids: List[str], attributes: Dict[str, Any]) -> None:
+        """ Submits a light command to the shared command scheduler, sending whole configured light groups to the group entities. """
+        compressed_entity_ids = self._light_groups.compress(entity_ids)
+        self._statistics.increment(STAT_LIGHT_MESSAGES_SAVED, len(entity_ids) - len(compressed_entity_ids))
+
+        if service == SERVICE_TURN_ON:
+            priority = PRIORITY_ACTIVE_TURN_ON if self._current_status == STATUS_ACTIVE else PRIORITY_IDLE_TURN_ON
+        else:
+            priority = PRIORITY_ACTIVE_TURN_OFF if self._current_status == STATUS_ACTIVE else PRIORITY_IDLE_TURN_OFF
+
+        lights = self._all_light_groups.expand(compressed_entity_ids) | set(compressed_entity_ids)
+        overlapping_entity_ids = lights.union(*(self._all_light_groups.groups_of(light) for light in lights))
+        pending_priority = self.command_scheduler.pending_priority(overlapping_entity_ids)
+
+        if pending_priority is not None:
+            priority = max(priority, pending_priority)
+
+        self.command_scheduler.async_submit(LIGHT_DOMAIN, service, { CONF_ENTITY_ID: compressed_entity_ids, **attributes }, self._command_context or self.create_context(), priority, self._on_commands_sent)
 
 
     #--------------------------------------------#
@@ -384,11 +768,19 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
         if not self.is_on:
             return
 
-        lights = await async_resolve_target(self.hass, service_data.get(CONF_LIGHTS))
+        context = self._context
+        self._statistics.increment(STAT_EVENTS_HANDLED)
+        lights = await self.target_resolver.async_resolve(service_data.get(CONF_LIGHTS))
+        self._requested_lights.update(lights)
         for light in lights:
             if not light in self._tracked_lights:
                 self._tracked_lights.append(light)
 
+        self._update_listeners()
+
+        if self._register_response(self._reset_window, context) and self._reset_window.is_complete:
+            self._on_reset_finished()
+
     async def _async_service_turn_off(self, **service_data: Any) -> None:
         """ Handles a call to the 'automatic_lighting.turn_off' service. """
         if not self.is_on:
@@ -409,40 +801,80 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
         else:
             self.logger.debug(f"Turning off profile {self._current_profile.id} in {delay} seconds.")
             self._current_turn_off_time = datetime.now() + timedelta(seconds=delay)
-            self._turn_off_timer = async_call_later(self.hass, delay, self._request)
+            self._turn_off_timer = self.timer_wheel.async_call_later(delay, self._on_turn_off_timer)
+            self._schedule_state_write()
 
     async def _async_service_turn_on(self, **service_data: Any) -> None:
         """ Handles a call to the 'automatic_lighting.turn_on' service. """
         if not self.is_on:
             return
 
+        context = self._context
         id = service_data.pop(CONF_ID)
         status = service_data.pop(CONF_STATUS)
-        lights = await async_resolve_target(self.hass, service_data.pop(CONF_LIGHTS))
-        attributes = service_data
+        lights = await self.target_resolver.async_resolve(service_data.pop(CONF_LIGHTS))
+        self.async_apply_profile(context, id, status, lights, service_data)
+
+    @callback
+    def async_apply_profile(self, context: Context, id: str, status: str, lights: List[str], attributes: Dict[str, Any], command_context: Context = None) -> None:
+        """ Applies a profile with resolved lights, sending the light commands with the command context if given. """
+        if not self.is_on:
+            return
+
+        self._statistics.increment(STAT_EVENTS_HANDLED)
+
+        if command_context:
+            self._context_registry.register(command_context)
+
+        self._command_context = command_context
 
+        try:
+            self._apply_profile(context, id, status, lights, attributes)
+        finally:
+            self._command_context = None
+
+    def _apply_profile(self, context: Context, id: str, status: str, lights: List[str], attributes: Dict[str, Any]) -> None:
+        """ Applies a profile, or records it as the response to the pending request. """
         if self._request_timer:
-            if self._current_profile and self._current_profile.status == STATUS_ACTIVE and status == STATUS_IDLE:
-                return
+            if not self._current_profile or self._current_profile.status != STATUS_ACTIVE or status != STATUS_IDLE:
+                self._current_profile = Profile(id, status, lights, attributes)
+
+            if self._register_response(self._request_window, context) and self._request_window.is_complete:
+                self._on_request_finished()
 
-            self._current_profile = Profile(id, status, lights, attributes)
             return
 
-        if self._current_profile and (datetime.now() - self._current_profile.time_of_creation).total_seconds() < TURN_ON_THROTTLE_TIME:
+        if self._register_response(self._request_window, context):
+            if self._current_profile and self._current_profile.status == STATUS_ACTIVE and status == STATUS_IDLE:
+                return
+        elif self._current_profile and monotonic() - self._current_profile.created_at < TURN_ON_THROTTLE_TIME:
             return
 
         if self.is_blocked:
             return self._block(self._block_duration)
 
+        profile = Profile(id, status, lights, attributes)
+
+        if profile == self._current_profile:
+            self.logger.debug(f"Profile {id} is already turned on.")
+            self._count_commands(0, len(lights))
+
+            if self._turn_off_timer:
+                self._reset_turn_off_timer()
+                self._schedule_state_write()
+
+            return
+
         if self._current_profile and self._current_profile.id != id:
             self._turn_off_unused_entities(self._current_profile.lights, lights)
 
         self.logger.debug(f"Turning on profile {id} with following values: { {CONF_ENTITY_ID: lights, **attributes} }")
-        self._current_profile = Profile(id, status, lights, attributes)
+        self._current_profile = profile
         self._current_status = status
+        self._cache_profile(self._current_profile)
         self._reset_turn_off_timer()
-        self.call_service(LIGHT_DOMAIN, SERVICE_TURN_ON, entity_id=lights, **attributes)
-        self.async_schedule_update_ha_state(True)
+        self._turn_on_lights(lights, attributes)
+        self._schedule_state_write()
 
 
     #--------------------------------------------#
@@ -456,11 +888,35 @@ class AL_SwitchEntity(SwitchEntity, RestoreEntity, EntityBase):
         else:
             self.logger.debug(f"Detected a state change to {entity_id}.")
 
-        self._reset()
+        self._statistics.increment(STAT_EVENTS_HANDLED)
+        self._request_window.forget_responders()
+        self._reset_window.forget_responders()
+        self.reload_coordinator.async_schedule(self.unique_id, self._reset)
+
+    @callback
+    def _on_commands_sent(self, entity_ids: List[str]) -> None:
+        """ Triggered when the command scheduler sends a light command of the entity. """
+        self.manual_control_dispatcher.async_expect(self.unique_id, self._all_light_groups.expand(entity_ids))
+
+    @callback
+    def _on_light_groups_discovered(self, changed_groups: Set[str]) -> None:
+        """ Triggered when the membership of discovered light groups changes. """
+        self.logger.debug(f"Membership of light groups changed: {sorted(changed_groups)}")
+        self._update_all_light_groups()
 
     async def _async_on_manual_control(self, entity_ids: List[str], context: Context) -> None:
         """ Triggered when manual control of the lights are detected. """
+        started = self._statistics.clock()
         self.logger.debug(f"Manual control was detected for the following entities: {entity_ids}")
+        self._statistics.increment(STAT_EVENTS_HANDLED)
         self._block(self._block_duration if self.is_blocked else self._block_config_duration)
+        self._statistics.observe(TIMING_MANUAL_CONTROL, started)
+
 
+# -----------------------------------------------------------#
+#       Helpers
+# -----------------------------------------------------------#
 
+def _parse_datetime(value: Union[str, None]) -> Union[datetime, None]:
+    """ Parses a datetime saved in the restore data. """
+    return datetime.fromisoformat(value) if value else None